@@ -19,8 +19,15 @@ USE_TG_BOT = False
 USE_MOBILE_PROXY = False
 
 # Ссылка на смену ip адреса мобильных прокси.
+# Для нескольких мобильных прокси – словарь {прокси из proxies.txt: ссылка на смену ip}, например:
+# {"user:pass@ip:port": "https://...", "user:pass@ip2:port2": "https://..."}
+# Кошельки распределяются по прокси по кругу, каждый прокси работает с одним кошельком и меняет ip между кошельками.
 PROXY_CHANGE_IP_URL = ""
 
+# Пакетная проверка балансов (Multicall): True – балансы всех кошельков запрашиваются одним запросом на сеть без прокси,
+# False – каждый кошелек проверяется отдельно через свой прокси.
+USE_BATCH_BALANCE_CHECKER = True
+
 ##########################################################################
 ########################### Основные настройки ###########################
 ##########################################################################
@@ -49,6 +56,51 @@ USE_SWAP_BEFORE_BRIDGE = True
 # Количество знаков после запятой, в случае, если число округляется.
 ROUND_TO = 5
 
+# Выбор маршрута для прогрева: True – с вероятностью, пропорциональной оставшемуся количеству транзакций,
+# False – все оставшиеся маршруты равновероятны.
+WARMUP_WEIGHTED_ACTIONS = False
+
+# Время жизни закешированных комиссий LayerZero (Merkly / Stargate / CoreBridge) в секундах.
+LZ_FEE_QUOTE_TTL = 60
+
+# Максимальная комиссия бриджа в нативной монете сети-источника, например {"BSC": 0.005}.
+# Маршруты с комиссией выше пропускаются. Для сетей, которых нет в списке, ограничения нет.
+MAX_BRIDGE_FEE = {}
+
+# Режим без интерфейса (для серверов): True – таблица с ожидающими кошельками не выводится, False – выводится.
+HEADLESS_MODE = False
+
+##########################################################################
+########################### Параллельный режим ###########################
+##########################################################################
+
+# Количество кошельков, которые прогреваются одновременно (1 = последовательный режим).
+WARMUP_CONCURRENCY = 1
+
+# Максимальное количество транзакций, одновременно отправляемых и подтверждаемых в одной сети-источнике
+# (задержки между действиями в лимит не входят).
+MAX_ACTIONS_PER_CHAIN = 5
+
+# Максимальное количество кошельков, одновременно работающих через один прокси.
+MAX_WALLETS_PER_PROXY = 1
+
+# Потоковое чтение базы: кошельки читаются из базы по мере запуска, а не загружаются в память целиком
+# (для очень больших баз, только при WARMUP_CONCURRENCY > 1).
+USE_STREAMING_DATABASE = False
+
+# Ограничение частоты запросов к RPC / API: хост -> [запросов в секунду, максимальный всплеск].
+# Для хостов, которых нет в списке, используется "default".
+RATE_LIMITS = {
+    "default": [10, 20],
+    "rpc.ankr.com": [25, 30],
+    "1rpc.io": [10, 10],
+    "api.0x.org": [1, 2],
+    "www.okx.com": [5, 5]
+}
+
+# Отдельный лимит для каждого прокси (True) или общий лимит на хост для всех прокси (False).
+RATE_LIMIT_PER_PROXY = False
+
 ##########################################################################
 ################################### OKX ##################################
 ##########################################################################
@@ -96,14 +148,21 @@ USE_OKX_WITHDRAW = {
     }
 }
 
+# В многопоточном режиме (WARMUP_CONCURRENCY > 1) выводы с OKX делаются заранее: кошельки, которым не хватит
+# баланса в сети-источнике, ждут поступления средств, а остальные продолжают работу.
+# Максимальное количество одновременно ожидаемых выводов:
+MAX_PENDING_WITHDRAWALS = 5
+
 ##########################################################################
 ##################### RPC (заполнить для всех сетей) #####################
 ##########################################################################
 
+# Можно указать одну ссылку или список ссылок: запросы идут на самую быструю рабочую RPC,
+# медленные запросы дублируются на следующую, а при ошибках RPC переключается автоматически.
 MAINNET_RPC_URL = "https://rpc.ankr.com/eth"
 ARBITRUM_RPC_URL = ""
 OPTIMISM_RPC_URL = ""
-POLYGON_RPC_URL = "https://1rpc.io/matic"
+POLYGON_RPC_URL = ["https://1rpc.io/matic", "https://polygon-rpc.com"]
 BSC_RPC_URL = "https://rpc.ankr.com/bsc"  # обязательно поставить приватный анкор
 MOONBEAM_RPC_URL = "https://1rpc.io/glmr"
 DFK_RPC_URL = "https://subnets.avax.network/defi-kingdoms/dfk-chain/rpc"
@@ -119,6 +178,10 @@ BASE_RPC_URL = ""
 CONFLUX_RPC_URL = "https://evm.confluxrpc.com"
 ZORA_RPC_URL = ""
 
+# WebSocket RPC-ссылки (необязательно): сеть -> wss ссылка, например {"BSC": "wss://..."}.
+# Если ссылка указана, новые блоки отслеживаются через подписку, а не опросом RPC.
+WS_RPC_URLS = {}
+
 ##########################################################################
 ########################## Количество транзакций #########################
 ##########################################################################
@@ -0,0 +1,72 @@
+"""
+Import time of the entry points, each measured in a fresh interpreter with `python -X importtime`.
+
+    python import_benchmark.py [runs] [top]
+"""
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT_DIR = Path(__file__).parent.absolute()
+
+# what `main.py` imports before showing the menu, then what each mode imports after it is selected
+TARGETS = [
+    "modules",
+    "modules.database",
+    "modules.balance_checker",
+    "modules.warmup",
+    "modules.scheduler",
+    "sdk.okx",
+]
+
+
+def measure(target: str) -> Tuple[float, Dict[str, float]]:
+    """Total import time of `target` and the self time of every module it imported, in ms."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=ROOT_DIR,
+        env={**os.environ, "PYTHONPATH": str(ROOT_DIR)},
+        capture_output=True,
+        text=True,
+        check=True
+    )
+
+    total, modules = 0.0, {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+
+        self_time, cumulative_time, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = int(self_time) / 1000
+
+        if name.strip() == target:
+            total = int(cumulative_time) / 1000
+
+    return total, modules
+
+
+def main(runs: int = 5, top: int = 10) -> None:
+    for target in TARGETS:
+        totals: List[float] = []
+        self_times: Dict[str, List[float]] = defaultdict(list)
+
+        for _ in range(runs):
+            total, modules = measure(target=target)
+            totals.append(total)
+
+            for name, self_time in modules.items():
+                self_times[name].append(self_time)
+
+        print(f"{target}: {statistics.median(totals):.0f} ms (median of {runs}, {len(self_times)} modules)")
+
+        slowest = sorted(self_times.items(), key=lambda item: statistics.median(item[1]), reverse=True)
+        for name, times in slowest[:top]:
+            print(f"    {statistics.median(times):8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:3]))
@@ -1,4 +1,5 @@
 import asyncio
+import multiprocessing
 
 from modules import Manager
 
@@ -8,5 +9,8 @@ async def main():
 
 
 if __name__ == "__main__":
+    # addresses of large key files are derived in a process pool, which frozen builds only support with this
+    multiprocessing.freeze_support()
+
     loop = asyncio.get_event_loop()
     loop.run_until_complete(main())
@@ -1,2 +1,10 @@
-from .database import Database
 from .manager import Manager
+
+
+def __getattr__(name: str):
+    # Database pulls in the dapps (and web3 with them) through DataItem
+    if name == "Database":
+        from modules.database import Database
+        return Database
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,46 +1,78 @@
+import asyncio
+
 from rich.console import Console
 from rich.table import Table
 
-from config import USE_MOBILE_PROXY
+from config import USE_BATCH_BALANCE_CHECKER
 from modules import Database
 from sdk import Client, logger
 from sdk.models.chain import BSC, Gnosis, Polygon, Celo, Arbitrum, Moonbeam, Moonriver, Conflux
-from sdk.utils import change_ip
+from sdk.multicall import Multicall
+from sdk.proxy_rotation import proxy_rotator
 
 
 async def balance_checker():
-    database = Database.read_from_json()
-    data_index = 0
+    database = Database.load()
 
     table = Table(title="Balance checker")
     chains = [BSC, Gnosis, Polygon, Celo, Arbitrum, Moonbeam, Moonriver, Conflux]
-    rows = []
 
     logger.info("Please wait")
 
+    if USE_BATCH_BALANCE_CHECKER:
+        rows = await get_balance_rows_batched(database=database, chains=chains)
+    else:
+        rows = await get_balance_rows(database=database, chains=chains)
+
+    for chain in chains:
+        table.add_column(chain.name)
+
+    for row in rows:
+        table.add_row(*row, style='bright_green')
+
+    console = Console()
+    console.print(table)
+
+
+async def get_balance_rows_batched(database: Database, chains: list) -> list:
+    addresses = [data_item.address for data_item in database.data]
+
+    chains_balances = await asyncio.gather(*[
+        Multicall.get_native_balances(chain=chain, addresses=addresses) for chain in chains
+    ])
+
+    rows = []
+
+    for address in addresses:
+        row = []
+
+        for balances in chains_balances:
+            balance = balances.get(address)
+            row.append("-" if balance is None else str(round(balance / 10 ** 18, 5)))
+
+        rows.append(row)
+
+    return rows
+
+
+async def get_balance_rows(database: Database, chains: list) -> list:
+    data_index = 0
+    rows = []
+
     while data_index < len(database.data):
         try:
-            if USE_MOBILE_PROXY:
-                await change_ip()
-
             data_item = database.data[data_index]
             row = []
 
-            for chain in chains:
-                client = Client(private_key=data_item.private_key, proxy=data_item.proxy, chain=chain)
-                balance = await client.get_native_balance(chain=chain) / 10 ** 18
-                row.append(str(round(balance, 5)))
+            async with proxy_rotator.use(proxy=data_item.proxy, wallet=data_item.address):
+                for chain in chains:
+                    client = Client(private_key=data_item.private_key, proxy=data_item.proxy, chain=chain)
+                    balance = await client.get_native_balance(chain=chain) / 10 ** 18
+                    row.append(str(round(balance, 5)))
 
             data_index += 1
             rows.append(row)
         except Exception as ex:
             logger.exception(f"[Balance checker] Error occurred: {ex}")
 
-    for chain in chains:
-        table.add_column(chain.name)
-
-    for row in rows:
-        table.add_row(*row, style='bright_green')
-
-    console = Console()
-    console.print(table)
+    return rows
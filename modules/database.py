@@ -1,43 +1,123 @@
 import itertools
 import json
+import os
 import random
-from dataclasses import dataclass
-from typing import List, Dict, Any, Optional
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, Iterator
 
 from config import USE_MOBILE_PROXY, STARGATE_TX_COUNT, CORE_TX_COUNT, MERKLY_TX_COUNT
-from sdk import logger, Client
-from sdk.constants import PRIVATE_KEYS_PATH, PROXIES_PATH, DEPOSIT_ADDRESSES_PATH, DATABASE_PATH
+from modules.storage import SqliteStorage, JSON_IMPORTED_KEY
+from sdk import logger
+from sdk.constants import (
+    PRIVATE_KEYS_PATH,
+    PROXIES_PATH,
+    DEPOSIT_ADDRESSES_PATH,
+    DATABASE_PATH,
+    DATABASE_JSON_PATH,
+    DATABASE_STREAM_CHUNK_SIZE
+)
 from sdk.models.data_item import DataItem
-from sdk.utils import read_from_txt
+from sdk.utils import read_from_txt, derive_address, derive_addresses
+
+
+# DataItem fields with a secondary index, values must be hashable
+INDEXED_FIELDS = (
+    "proxy",
+    "chain_with_funds",
+    "warmup_started",
+    "warmup_finished",
+    "okx_withdrawn",
+    "polygon_from_usdc_swapped",
+    "from_polygon_ageur_bridged",
+    "to_polygon_ageur_bridged",
+    "polygon_to_usdc_swapped",
+    "sent_to_okx",
+)
+
+
+class IndexBucket:
+    """Set of items with O(1) add / remove / random choice."""
+
+    def __init__(self) -> None:
+        self.items: List[DataItem] = []
+        self.positions: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(list(self.items))
+
+    def add(self, item: DataItem) -> None:
+        if item.address not in self.positions:
+            self.positions[item.address] = len(self.items)
+            self.items.append(item)
+
+    def remove(self, item: DataItem) -> None:
+        index = self.positions.pop(item.address, None)
+
+        if index is None:
+            return
+
+        last_item = self.items.pop()
+
+        if last_item is not item:
+            self.items[index] = last_item
+            self.positions[last_item.address] = index
+
+    def random_choice(self) -> DataItem:
+        return random.choice(self.items)
 
 
 @dataclass
 class Database:
     data: List[DataItem]
+    storage: SqliteStorage | None = field(default=None, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self._build_indexes()
 
     def _to_dict(self) -> List[Dict[str, Any]]:
-        return [vars(data_item) for data_item in self.data]
+        return [data_item.to_dict() for data_item in self.data]
 
     @staticmethod
     def create_database() -> "Database":
         data = []
+        seen_addresses = set()
 
         private_keys = read_from_txt(file_path=PRIVATE_KEYS_PATH)
         proxies = read_from_txt(file_path=PROXIES_PATH)
         deposit_addresses = read_from_txt(file_path=DEPOSIT_ADDRESSES_PATH)
 
-        if USE_MOBILE_PROXY:
-            proxies = proxies * len(private_keys)
+        # wallets are spread over the mobile proxies round-robin, each proxy changes its ip between them
+        if USE_MOBILE_PROXY and proxies:
+            proxies = list(itertools.islice(itertools.cycle(proxies), len(private_keys)))
+
+        addresses = iter(derive_addresses(private_keys=[private_key for private_key in private_keys if private_key]))
 
         for private_key, proxy, deposit_address in itertools.zip_longest(
                 private_keys, proxies, deposit_addresses, fillvalue=None
         ):
-            try:
-                temp_client = Client(private_key=private_key, proxy=proxy)
+            if not private_key:
+                continue
+
+            address = next(addresses)
+
+            if not address:
+                logger.error(f"[Database] Skipping invalid private key", send_to_tg=False)
+                continue
+
+            if address in seen_addresses:
+                logger.warning(f"[Database] Skipping duplicate private key of {address}", send_to_tg=False)
+                continue
 
+            seen_addresses.add(address)
+
+            try:
                 item = DataItem(
                     private_key=private_key,
-                    address=temp_client.address,
+                    address=address,
                     proxy=proxy,
                     deposit_address=deposit_address,
                     merkly_tx_count=Database.get_randomized_merkly_tx_counts(),
@@ -50,16 +130,75 @@ class Database:
                 logger.exception(f"[Database] {e}")
 
         logger.success(f"[Database] Created successfully", send_to_tg=False)
-        return Database(data=data)
+        return Database(data=data, storage=SqliteStorage(file_name=DATABASE_PATH))
+
+    def save_database(self):
+        """Rewrites the whole storage in a single transaction."""
+        self.storage.replace_items(self._to_dict())
 
-    def save_database(self, file_name: str = DATABASE_PATH):
-        db_dict = self._to_dict()
+    def save_item(self, data_item: DataItem):
+        self.storage.save_item(data_item.to_dict())
 
-        with open(file_name, "w") as json_file:
-            json.dump(db_dict, json_file, indent=4)
+    def save_items(self, data_items: List[DataItem]):
+        """Saves several items in a single transaction."""
+        self.storage.save_items([data_item.to_dict() for data_item in data_items])
+
+    def set_funds(self, data_item: DataItem, balances: Dict[str, Dict[str, float]]):
+        """Updates the balance snapshot and chain_with_funds of an item in memory, stored with the next save."""
+        # streamed items are not indexed
+        indexed = data_item.address in self._positions
+
+        if indexed:
+            self._unindex_item(data_item, fields=("chain_with_funds",))
+
+        data_item.balances = balances
+        data_item.chain_with_funds = data_item.get_chain_with_funds()
+
+        if indexed:
+            self._index_item(data_item, fields=("chain_with_funds",))
 
     @classmethod
-    def read_from_json(cls, file_name: str = DATABASE_PATH) -> "Database":
+    def load(cls, file_name: str = DATABASE_PATH, streaming: bool = False) -> "Database":
+        """
+        Loads every item into memory, or with streaming=True only opens the storage:
+        items are then read chunk by chunk through iter_items.
+        """
+        storage = SqliteStorage(file_name=file_name)
+
+        # an empty table may also mean every wallet finished, so the legacy JSON is only ever imported once
+        if not storage.is_json_imported():
+            if storage.is_empty() and os.path.exists(DATABASE_JSON_PATH):
+                database = cls.read_from_json(file_name=DATABASE_JSON_PATH)
+                database.storage = storage
+                database.save_database()
+                os.replace(DATABASE_JSON_PATH, f"{DATABASE_JSON_PATH}.migrated")
+
+                logger.success(
+                    f"[Database] Migrated {len(database.data)} items from {DATABASE_JSON_PATH} to {file_name}",
+                    send_to_tg=False
+                )
+
+                if not streaming:
+                    return database
+            else:
+                storage.set_meta(key=JSON_IMPORTED_KEY, value="1")
+
+        if streaming:
+            return cls(data=[], storage=storage)
+
+        data = [DataItem(**item) for item in storage.load_items()]
+
+        return cls(data=data, storage=storage)
+
+    def iter_items(self, shuffle: bool = True) -> Iterator[DataItem]:
+        for item in self.storage.iter_items(chunk_size=DATABASE_STREAM_CHUNK_SIZE, shuffle=shuffle):
+            yield DataItem(**item)
+
+    def count_items(self) -> int:
+        return self.storage.count_items()
+
+    @classmethod
+    def read_from_json(cls, file_name: str = DATABASE_JSON_PATH) -> "Database":
         try:
             with open(file_name, "r") as json_file:
                 db_dict = json.load(json_file)
@@ -69,25 +208,27 @@ class Database:
         data = []
 
         for item in db_dict:
-            account_data = {
-                "private_key": item.pop("private_key"),
-                "proxy": item.pop("proxy"),
-            }
+            if not item.get("address"):
+                item["address"] = derive_address(private_key=item["private_key"])
 
-            item.pop("address")
+            # older databases stored chain_with_funds as [null], it is indexed and has to be a chain name or None
+            if not isinstance(item.get("chain_with_funds"), str):
+                item["chain_with_funds"] = None
 
-            account = Client(**account_data)
-            data_item = DataItem(
-                private_key=account.private_key,
-                address=account.address,
-                proxy=account_data["proxy"],
-                **item
-            )
-            data.append(data_item)
+            data.append(DataItem(**item))
 
         return cls(data=data)
 
     def get_random_item_by_criteria(self, **kwargs) -> Optional[tuple[DataItem, int]]:
+        bucket = self._get_smallest_bucket(**kwargs)
+
+        if bucket is not None and len(kwargs) == 1:
+            if not bucket:
+                return None
+
+            random_item = bucket.random_choice()
+            return random_item, self.get_item_index_by_data(random_item)
+
         filtered_items = self.query_items_by_criteria(**kwargs)
 
         if filtered_items:
@@ -99,20 +240,25 @@ class Database:
 
     def delete_item_if_finished(self, data_item: DataItem) -> bool:
         if data_item.get_tx_count() == 0:
-            self.data.remove(data_item)
+            self._remove_item(data_item)
+            self.storage.delete_item(data_item.address)
             return True
         return False
 
     def get_item_index_by_data(self, search_item: DataItem) -> Optional[int]:
-        for index, item in enumerate(self.data):
-            if item == search_item:
-                return index
-        return None
+        return self._positions.get(search_item.address)
+
+    def get_item_by_address(self, address: str) -> Optional[DataItem]:
+        index = self._positions.get(address)
+        return self.data[index] if index is not None else None
 
     def query_items_by_criteria(self, **kwargs) -> List[DataItem]:
+        bucket = self._get_smallest_bucket(**kwargs)
+        candidates = self.data if bucket is None else bucket
+
         filtered_items = []
 
-        for item in self.data:
+        for item in candidates:
             if all(getattr(item, key) == value for key, value in kwargs.items()):
                 filtered_items.append(item)
 
@@ -128,16 +274,20 @@ class Database:
         if 0 <= item_index < len(self.data):
             item = self.data[item_index]
 
+            self._unindex_item(item, fields=kwargs.keys())
+
             for key, value in kwargs.items():
                 setattr(item, key, value)
 
-            self.save_database()
+            self._index_item(item, fields=kwargs.keys())
+            self.save_item(item)
         else:
             logger.error(f"[Database] Invalid item index: {item_index}")
 
     def reset_item(self, item_index: int):
         if 0 <= item_index < len(self.data):
             item = self.data[item_index]
+            self._unindex_item(item)
             item.chain_with_funds = None
             item.warmup_started = False
             item.warmup_finished = True
@@ -147,10 +297,56 @@ class Database:
             item.to_polygon_ageur_bridged = False
             item.polygon_to_usdc_swapped = False
             item.sent_to_okx = False
-            self.save_database()
+            self._index_item(item)
+            self.save_item(item)
         else:
             logger.error(f"[Database] Invalid item index: {item_index}")
 
+    def _build_indexes(self) -> None:
+        self._positions = {item.address: index for index, item in enumerate(self.data)}
+        self._indexes = {key: defaultdict(IndexBucket) for key in INDEXED_FIELDS}
+
+        for item in self.data:
+            self._index_item(item)
+
+    def _index_item(self, item: DataItem, fields=INDEXED_FIELDS) -> None:
+        for key in fields:
+            if key in self._indexes:
+                self._indexes[key][getattr(item, key)].add(item)
+
+    def _unindex_item(self, item: DataItem, fields=INDEXED_FIELDS) -> None:
+        for key in fields:
+            if key in self._indexes:
+                value = getattr(item, key)
+                self._indexes[key][value].remove(item)
+
+                if not self._indexes[key][value]:
+                    del self._indexes[key][value]
+
+    def _remove_item(self, item: DataItem) -> None:
+        index = self._positions.pop(item.address, None)
+
+        # streamed items are never loaded into the in-memory list
+        if index is None:
+            return
+
+        last_item = self.data.pop()
+
+        # the last item takes the place of the removed one, so removal doesn't shift the whole list
+        if last_item is not item:
+            self.data[index] = last_item
+            self._positions[last_item.address] = index
+
+        self._unindex_item(item)
+
+    def _get_smallest_bucket(self, **kwargs) -> Optional["IndexBucket"]:
+        buckets = [
+            self._indexes[key].get(value, IndexBucket())
+            for key, value in kwargs.items() if key in self._indexes
+        ]
+
+        return min(buckets, key=len) if buckets else None
+
     @staticmethod
     def get_randomized_merkly_tx_counts():
         return {
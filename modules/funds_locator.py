@@ -0,0 +1,99 @@
+import asyncio
+import itertools
+from typing import AsyncIterator, Dict, Iterable, List
+
+from modules.database import Database
+from sdk import logger
+from sdk.constants import BALANCES_BATCH_SIZE
+from sdk.models.chain import NAMES_TO_CHAINS
+from sdk.models.data_item import DataItem
+from sdk.models.token import Token, USDT_Token, USDC_Token, STG_Token
+from sdk.multicall import Multicall
+
+# tokens left over from swaps that are snapshotted together with the native balance
+CHAIN_TOKENS: Dict[str, List[Token]] = {
+    "BSC": [USDT_Token],
+    "Polygon": [USDC_Token, STG_Token],
+}
+
+
+class FundsLocator:
+    """
+    Balance snapshot of many wallets at once: native and token balances of every source chain the wallets
+    still have actions on are read with one Multicall per chain and token, then stored on the items
+    (DataItem.balances and DataItem.chain_with_funds).
+    """
+
+    def __init__(self, database: Database) -> None:
+        self.database = database
+
+    async def iter_located(
+            self, items: Iterable[DataItem], chunk_size: int = BALANCES_BATCH_SIZE
+    ) -> AsyncIterator[DataItem]:
+        """Yields the items chunk by chunk, each chunk after its balances were located."""
+        items = iter(items)
+
+        while chunk := list(itertools.islice(items, chunk_size)):
+            await self.locate(items=chunk)
+
+            for data_item in chunk:
+                yield data_item
+
+    async def locate(self, items: List[DataItem]) -> None:
+        chain_names = {
+            action.split('-')[0] for data_item in items for action, _ in data_item.get_remaining_actions()
+        }
+        chain_names = [chain_name for chain_name in chain_names if NAMES_TO_CHAINS[chain_name].rpcs]
+
+        if not chain_names:
+            return
+
+        addresses = [data_item.address for data_item in items]
+        snapshots = await asyncio.gather(*[
+            self._get_chain_balances(chain_name=chain_name, addresses=addresses) for chain_name in chain_names
+        ])
+
+        for data_item in items:
+            balances = {
+                chain_name: snapshot[data_item.address]
+                for chain_name, snapshot in zip(chain_names, snapshots) if snapshot.get(data_item.address)
+            }
+
+            self.database.set_funds(data_item=data_item, balances=balances)
+
+        self.database.save_items(data_items=items)
+
+        logger.debug(
+            f"[Funds locator] Located funds of {len(items)} wallets in {len(chain_names)} chains",
+            send_to_tg=False
+        )
+
+    @staticmethod
+    async def _get_chain_balances(chain_name: str, addresses: List[str]) -> Dict[str, Dict[str, float]]:
+        """{address: {symbol: balance}}, balances that could not be read are left out."""
+        chain = NAMES_TO_CHAINS[chain_name]
+        tokens = CHAIN_TOKENS.get(chain_name, [])
+
+        native_balances, *token_balances = await asyncio.gather(
+            Multicall.get_native_balances(chain=chain, addresses=addresses),
+            *[
+                Multicall.get_token_balances(
+                    chain=chain, token_address=token.chain_to_contract_mapping[chain_name], addresses=addresses
+                )
+                for token in tokens
+            ]
+        )
+
+        snapshot = {address: {} for address in addresses}
+
+        for address in addresses:
+            if native_balances.get(address) is not None:
+                snapshot[address][chain.coin_symbol] = native_balances[address] / 10 ** 18
+
+            for token, balances in zip(tokens, token_balances):
+                if balances.get(address) is not None:
+                    # USDT on BSC has 18 decimals, see Client.get_token_balance
+                    decimals = 18 if token is USDT_Token and chain_name == "BSC" else token.decimals
+                    snapshot[address][token.symbol] = balances[address] / 10 ** decimals
+
+        return snapshot
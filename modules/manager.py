@@ -1,9 +1,8 @@
-from modules import Database
-from modules.balance_checker import balance_checker
-from modules.warmup import Warmup
+from config import WARMUP_CONCURRENCY
 from sdk import logger
 
 
+# modules are imported only after one is selected, so the menu shows up without waiting for web3
 class Manager:
     @staticmethod
     async def run_module():
@@ -12,11 +11,22 @@ class Manager:
             module = input("Start module: ")
 
             if module == "1":
+                from modules.database import Database
+
                 database = Database.create_database()
                 database.save_database()
             elif module == "2":
-                await Warmup.execute_mode()
+                if WARMUP_CONCURRENCY > 1:
+                    from modules.scheduler import Scheduler
+
+                    await Scheduler.execute_mode()
+                else:
+                    from modules.warmup import Warmup
+
+                    await Warmup.execute_mode()
             elif module == "3":
+                from modules.balance_checker import balance_checker
+
                 await balance_checker()
             else:
                 logger.error(f"Invalid module number: {module}", send_to_tg=False)
@@ -25,6 +35,19 @@ class Manager:
             logger.error("Finishing script", send_to_tg=False)
         except Exception as e:
             logger.exception(str(e))
+        finally:
+            from sdk.okx import okx_pool
+            from sdk.providers import provider_pool
+            from sdk.rate_limiter import rate_limiter
+            from sdk.retry import retry_metrics
+            from sdk.watchers import watcher_pool
+
+            watcher_pool.close()
+            await provider_pool.close()
+            await okx_pool.close()
+            rate_limiter.log_stats()
+            retry_metrics.log_stats()
+            logger.close()
 
 
 start_message = r"""
@@ -0,0 +1,248 @@
+import asyncio
+import random
+from collections import defaultdict
+from contextlib import nullcontext
+from typing import Iterator, List
+
+from config import (
+    USE_OKX_WITHDRAW,
+    WARMUP_CONCURRENCY,
+    MAX_ACTIONS_PER_CHAIN,
+    MAX_WALLETS_PER_PROXY,
+    MAX_PENDING_WITHDRAWALS,
+    USE_STREAMING_DATABASE
+)
+from modules.database import Database
+from modules.funds_locator import FundsLocator
+from modules.warmup import Warmup
+from sdk.dapps import Merkly
+from sdk import Client, logger
+from sdk.constants import WARMUP_MAX_FAILED_ACTIONS, PREFUND_BACKLOG_MULTIPLIER
+from sdk.fee_quotes import lz_fee_quotes, BridgeFeeTooHighError
+from sdk.models.chain import Chain, NAMES_TO_CHAINS
+from sdk.models.data_item import DataItem
+from sdk.progress import set_wallet_label
+from sdk.proxy_rotation import proxy_rotator
+from sdk.watchers import watcher_pool
+
+
+class Scheduler:
+    def __init__(
+            self,
+            database: Database,
+            concurrency: int = WARMUP_CONCURRENCY,
+            max_actions_per_chain: int = MAX_ACTIONS_PER_CHAIN,
+            max_wallets_per_proxy: int = MAX_WALLETS_PER_PROXY,
+            max_pending_withdrawals: int = MAX_PENDING_WITHDRAWALS
+    ) -> None:
+        self.database = database
+        self.concurrency = concurrency
+        self.funds_locator = FundsLocator(database=database)
+
+        self.chain_semaphores = defaultdict(lambda: asyncio.Semaphore(max_actions_per_chain))
+        self.proxy_semaphores = defaultdict(lambda: asyncio.Semaphore(max_wallets_per_proxy))
+        self.withdrawal_semaphore = asyncio.Semaphore(max_pending_withdrawals)
+        # wallets waiting for a withdrawal slot are held in memory, so their number is bounded too
+        self.funding_backlog = asyncio.Semaphore(max_pending_withdrawals * PREFUND_BACKLOG_MULTIPLIER)
+
+    @staticmethod
+    async def execute_mode():
+        database = Database.load(streaming=USE_STREAMING_DATABASE)
+        await Scheduler(database=database).run(streaming=USE_STREAMING_DATABASE)
+
+    async def run(self, streaming: bool = False) -> None:
+        if streaming:
+            items = self.database.iter_items(shuffle=True)
+            items_count = self.database.count_items()
+        else:
+            shuffled_items = list(self.database.data)
+            random.shuffle(shuffled_items)
+            items = iter(shuffled_items)
+            items_count = len(shuffled_items)
+
+        logger.info(f"[Scheduler] Warming up {items_count} wallets, {self.concurrency} at a time")
+
+        await Merkly.prefetch_fees()
+
+        # the queue only holds a few wallets ahead of the workers, so items are hydrated close to when they run
+        ready_items = asyncio.Queue(maxsize=self.concurrency)
+        workers = [asyncio.create_task(self._worker(ready_items=ready_items)) for _ in range(self.concurrency)]
+
+        try:
+            await self._prefund(items=items, ready_items=ready_items)
+        finally:
+            for _ in workers:
+                await ready_items.put(None)
+
+        await asyncio.gather(*workers)
+
+        logger.success(f"[Scheduler] Warmup ended")
+
+    async def _prefund(self, items: Iterator[DataItem], ready_items: asyncio.Queue) -> None:
+        """
+        Passes wallets on to the workers. Balances are located in bulk first; a wallet that is short on one of
+        its source chains gets its OKX withdrawal started here and is only passed on once the funds landed,
+        while other wallets keep working.
+        """
+        funding_tasks = set()
+
+        async for data_item in self.funds_locator.iter_located(items=items):
+            try:
+                chains_to_fund = await self._get_chains_to_fund(data_item=data_item)
+            except Exception as ex:
+                logger.exception(f"[Scheduler] Error occurred: {ex}")
+                chains_to_fund = []
+
+            if not chains_to_fund:
+                await ready_items.put(data_item)
+                continue
+
+            # the withdrawal waits for its slot in the task, so funded wallets behind it keep reaching the workers
+            await self.funding_backlog.acquire()
+
+            task = asyncio.create_task(
+                self._fund_wallet(data_item=data_item, chains=chains_to_fund, ready_items=ready_items)
+            )
+            funding_tasks.add(task)
+            task.add_done_callback(funding_tasks.discard)
+            task.add_done_callback(lambda _: self.funding_backlog.release())
+
+        if funding_tasks:
+            await asyncio.gather(*funding_tasks)
+
+    @staticmethod
+    async def _get_chains_to_fund(data_item: DataItem) -> List[Chain]:
+        src_chain_names = {action.split('-')[0] for action, _ in data_item.get_remaining_actions()}
+        src_chains = [
+            NAMES_TO_CHAINS[chain_name] for chain_name in src_chain_names
+            if USE_OKX_WITHDRAW.get(chain_name, {}).get("use")
+        ]
+
+        if not src_chains:
+            return []
+
+        chains_to_fund = []
+
+        for chain in src_chains:
+            # the located snapshot is used when available, a balance missing from it is read directly,
+            # without the wallet's proxy, which may be serving another wallet right now
+            balance = data_item.get_native_balance(chain_name=chain.name)
+
+            if balance is None:
+                balance = await watcher_pool.get_funds_watcher(chain=chain).get_balance(address=data_item.address)
+                balance = None if balance is None else balance / 10 ** 18
+
+            # same threshold Warmup uses before a bridge, checked ahead of time
+            if balance is not None and balance <= USE_OKX_WITHDRAW[chain.name]["min-balance"]:
+                chains_to_fund.append(chain)
+
+        return chains_to_fund
+
+    async def _fund_wallet(self, data_item: DataItem, chains: List[Chain], ready_items: asyncio.Queue) -> None:
+        failed_chain_names = set()
+
+        async with self.withdrawal_semaphore:
+            set_wallet_label(address=data_item.address)
+
+            for chain in chains:
+                logger.info(f"[Scheduler] Funding {data_item.address} in {chain.name} from OKX", send_to_tg=False)
+
+                try:
+                    client = Client(private_key=data_item.private_key, proxy=data_item.proxy)
+                    funded = await Warmup.withdraw_from_okx(client=client, chain=chain)
+                except Exception as ex:
+                    logger.exception(f"[Scheduler] Error occurred: {ex}")
+                    funded = False
+
+                if not funded:
+                    logger.warning(f"[Scheduler] Could not fund {data_item.address} in {chain.name}")
+                    failed_chain_names.add(chain.name)
+
+        src_chain_names = {action.split('-')[0] for action, _ in data_item.get_remaining_actions()}
+
+        # the wallet still works on its other chains, which prefer the funded ones
+        if src_chain_names - failed_chain_names:
+            await ready_items.put(data_item)
+        else:
+            logger.warning(f"[Scheduler] No funded chains left for {data_item.address}, leaving it for the next run")
+
+    async def _worker(self, ready_items: asyncio.Queue) -> None:
+        while True:
+            data_item = await ready_items.get()
+
+            if data_item is None:
+                break
+
+            try:
+                async with self._hold_proxy(data_item=data_item):
+                    await self._warmup_wallet(data_item=data_item)
+            except Exception as ex:
+                logger.exception(f"[Scheduler] Error occurred: {ex}")
+
+    def _hold_proxy(self, data_item: DataItem):
+        # a mobile proxy serves one wallet at a time and changes its ip between wallets
+        if proxy_rotator.rotates(proxy=data_item.proxy):
+            return proxy_rotator.use(proxy=data_item.proxy, wallet=data_item.address)
+
+        # wallets without a proxy share the host ip, they are only limited by the concurrency
+        if not data_item.proxy:
+            return nullcontext()
+
+        return self.proxy_semaphores[data_item.proxy]
+
+    async def _warmup_wallet(self, data_item: DataItem) -> None:
+        # chain slots are only held while transactions are sent and confirmed, not during the delays after them
+        client = Client(private_key=data_item.private_key, proxy=data_item.proxy, tx_slots=self.chain_semaphores)
+        set_wallet_label(address=data_item.address)
+        failed_actions = 0
+
+        logger.debug(f"[Scheduler] Wallet: {data_item.address}")
+
+        while failed_actions < WARMUP_MAX_FAILED_ACTIONS:
+            action, dapp = data_item.get_random_warmup_action(
+                chains=data_item.get_funded_chains(), skipped_routes=lz_fee_quotes.get_skipped_routes()
+            )
+
+            if not action:
+                break
+
+            logger.info(
+                f"[Scheduler] {data_item.address} | {action} | Transactions left: {data_item.get_tx_count()}",
+                send_to_tg=False
+            )
+
+            try:
+                result = await Warmup.execute_warmup_action(
+                    item=data_item,
+                    action=action,
+                    dapp=dapp,
+                    client=client
+                )
+            except BridgeFeeTooHighError as ex:
+                # the route is skipped for now, another one is picked right away
+                logger.warning(f"[Scheduler] {ex}", send_to_tg=False)
+                continue
+            except Exception as ex:
+                logger.exception(f"[Scheduler] Error occurred: {ex}")
+                result = False
+
+            # chain_with_funds follows the balances refreshed by the action
+            self.database.set_funds(data_item=data_item, balances=data_item.balances)
+
+            if result:
+                failed_actions = 0
+                self.database.save_item(data_item=data_item)
+            else:
+                failed_actions += 1
+
+        if self.database.delete_item_if_finished(data_item=data_item):
+            logger.success(f"[Scheduler] No actions left for wallet {data_item.address}")
+        elif failed_actions < WARMUP_MAX_FAILED_ACTIONS:
+            logger.warning(
+                f"[Scheduler] Remaining routes of {data_item.address} are above MAX_BRIDGE_FEE, "
+                f"leaving it for the next run"
+            )
+        else:
+            logger.warning(
+                f"[Scheduler] {failed_actions} actions in a row failed for {data_item.address}, leaving it for the next run"
+            )
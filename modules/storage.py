@@ -0,0 +1,105 @@
+import json
+import random
+import sqlite3
+from typing import List, Dict, Any, Iterator
+
+# set once the storage was filled, by a JSON import or a new database
+JSON_IMPORTED_KEY = "json_imported"
+
+
+class SqliteStorage:
+    """Database items stored as one JSON row per wallet in a SQLite file in WAL mode."""
+
+    def __init__(self, file_name: str) -> None:
+        self.connection = sqlite3.connect(file_name)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS items (address TEXT PRIMARY KEY, data TEXT NOT NULL)"
+        )
+        self.connection.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self.connection.commit()
+
+    def get_meta(self, key: str) -> str | None:
+        row = self.connection.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str) -> None:
+        with self.connection:
+            self._set_meta(key=key, value=value)
+
+    def _set_meta(self, key: str, value: str) -> None:
+        self.connection.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, value)
+        )
+
+    def is_empty(self) -> bool:
+        return self.connection.execute("SELECT 1 FROM items LIMIT 1").fetchone() is None
+
+    def count_items(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+
+    def load_items(self) -> List[Dict[str, Any]]:
+        rows = self.connection.execute("SELECT data FROM items ORDER BY rowid")
+        return [json.loads(data) for (data,) in rows]
+
+    def iter_items(self, chunk_size: int, shuffle: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Yields items chunk by chunk (keyset pagination on rowid), so only one chunk is held in memory
+        and no cursor stays open while items are being updated.
+        """
+        last_rowid = -1
+
+        while True:
+            rows = self.connection.execute(
+                "SELECT rowid, data FROM items WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                (last_rowid, chunk_size)
+            ).fetchall()
+
+            if not rows:
+                return
+
+            last_rowid = rows[-1][0]
+
+            if shuffle:
+                random.shuffle(rows)
+
+            for _, data in rows:
+                yield json.loads(data)
+
+    def replace_items(self, items: List[Dict[str, Any]]) -> None:
+        """Rewrites the whole table, the legacy JSON database is never imported into it afterwards."""
+        with self.connection:
+            self.connection.execute("DELETE FROM items")
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO items (address, data) VALUES (?, ?)",
+                [(item["address"], json.dumps(item)) for item in items]
+            )
+            self._set_meta(key=JSON_IMPORTED_KEY, value="1")
+
+    def is_json_imported(self) -> bool:
+        return self.get_meta(key=JSON_IMPORTED_KEY) is not None
+
+    def save_item(self, item: Dict[str, Any]) -> None:
+        with self.connection:
+            self.connection.execute(
+                "INSERT INTO items (address, data) VALUES (?, ?) "
+                "ON CONFLICT(address) DO UPDATE SET data = excluded.data",
+                (item["address"], json.dumps(item))
+            )
+
+    def save_items(self, items: List[Dict[str, Any]]) -> None:
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO items (address, data) VALUES (?, ?) "
+                "ON CONFLICT(address) DO UPDATE SET data = excluded.data",
+                [(item["address"], json.dumps(item)) for item in items]
+            )
+
+    def delete_item(self, address: str) -> None:
+        with self.connection:
+            self.connection.execute("DELETE FROM items WHERE address = ?", (address,))
+
+    def close(self) -> None:
+        self.connection.close()
@@ -1,61 +1,82 @@
 import random
+from typing import List
 
 from config import (
-    USE_MOBILE_PROXY,
     ROUND_TO,
     USE_OKX_WITHDRAW,
     OKX_API_KEY,
     OKX_API_SECRET,
     OKX_API_PASSWORD,
     STARGATE_TX_COUNT,
-    MERKLY_TX_COUNT, CORE_TX_COUNT
+    MERKLY_TX_COUNT, CORE_TX_COUNT,
+    TX_DELAY_RANGE
 )
 from modules.database import Database
-from sdk import Client, logger, OKX
+from modules.funds_locator import FundsLocator
+from sdk import Client, logger
 from sdk.dapps import Stargate, CoreBridge
 from sdk.dapps.merkly import Merkly
-from sdk.models.chain import NAMES_TO_CHAINS
+from sdk.constants import OKX_BALANCE_RECHECK_MARGIN
+from sdk.fee_quotes import lz_fee_quotes, BridgeFeeTooHighError
+from sdk.models.chain import NAMES_TO_CHAINS, Chain
 from sdk.models.data_item import DataItem
-from sdk.utils import change_ip
+from sdk.progress import set_wallet_label
+from sdk.proxy_rotation import proxy_rotator
+from sdk.utils import sleep_pause
 
 
 class Warmup:
     @staticmethod
     async def execute_mode():
-        database = Database.read_from_json()
+        database = Database.load()
+        await FundsLocator(database=database).locate(items=database.data)
+        await Merkly.prefetch_fees()
 
         while True:
             try:
-                if USE_MOBILE_PROXY:
-                    await change_ip()
-
                 data_item, index = database.get_random_data_item()
 
                 if not data_item:
                     break
 
-                client = Client(private_key=data_item.private_key, proxy=data_item.proxy)
-
-                logger.info("", send_to_tg=False)
-                logger.debug(f"[Warmup] Wallet: {data_item.address}")
-                logger.info(f"[Warmup] Transactions left for this wallet: {data_item.get_tx_count()}", send_to_tg=False)
-
-                action, dapp = data_item.get_random_warmup_action()
-
-                if not action:
-                    if database.delete_item_if_finished(data_item=data_item):
-                        logger.warning(f"[Warmup] No actions left for this wallet")
-                        database.save_database()
-                    continue
-
-                if await Warmup.execute_warmup_action(
+                async with proxy_rotator.use(proxy=data_item.proxy, wallet=data_item.address):
+                    client = Client(private_key=data_item.private_key, proxy=data_item.proxy)
+                    set_wallet_label(address=data_item.address)
+
+                    logger.info("", send_to_tg=False)
+                    logger.debug(f"[Warmup] Wallet: {data_item.address}")
+                    logger.info(
+                        f"[Warmup] Transactions left for this wallet: {data_item.get_tx_count()}",
+                        send_to_tg=False
+                    )
+
+                    action, dapp = data_item.get_random_warmup_action(
+                        chains=data_item.get_funded_chains(), skipped_routes=lz_fee_quotes.get_skipped_routes()
+                    )
+
+                    if not action:
+                        if database.delete_item_if_finished(data_item=data_item):
+                            logger.warning(f"[Warmup] No actions left for this wallet")
+                        else:
+                            logger.warning(f"[Warmup] Remaining routes of this wallet are above MAX_BRIDGE_FEE")
+                            await sleep_pause(delay_range=TX_DELAY_RANGE, enable_message=False)
+                        continue
+
+                    result = await Warmup.execute_warmup_action(
                         item=data_item,
                         action=action,
                         dapp=dapp,
                         client=client
-                ):
-                    database.delete_item_if_finished(data_item=data_item)
-                    database.save_database()
+                    )
+
+                    # chain_with_funds follows the balances refreshed by the action
+                    database.set_funds(data_item=data_item, balances=data_item.balances)
+
+                    if result:
+                        if not database.delete_item_if_finished(data_item=data_item):
+                            database.save_item(data_item=data_item)
+            except BridgeFeeTooHighError as ex:
+                logger.warning(f"[Warmup] {ex}")
             except Exception as ex:
                 logger.exception(f"[Warmup] Error occurred: {ex}")
         logger.success(f"[Warmup] Warmup ended")
@@ -72,30 +93,24 @@ class Warmup:
         dst_chain = NAMES_TO_CHAINS[chains[1]]
 
         amount_to_use = await Warmup.uniform_bridge_amount(dapp=dapp, action=action)
-        src_chain_balance = (await client.get_native_balance(chain=src_chain)) / 10 ** 18
 
         if not amount_to_use:
             return None
 
         if src_chain.name in USE_OKX_WITHDRAW and USE_OKX_WITHDRAW[src_chain.name]["use"]:
-            if USE_OKX_WITHDRAW[src_chain.name]["min-balance"] >= src_chain_balance:
-                amount_to_withdraw = round(
-                    random.uniform(*USE_OKX_WITHDRAW[src_chain.name]["amount"]),
-                    ROUND_TO
-                )
-
-                okx = OKX(
-                    api_key=OKX_API_KEY,
-                    secret=OKX_API_SECRET,
-                    password=OKX_API_PASSWORD,
-                    client=client
-                )
-
-                await okx.withdraw(
-                    amount_to_withdraw=amount_to_withdraw,
-                    token=src_chain.coin_symbol,
-                    chain=src_chain
-                )
+            min_balance = USE_OKX_WITHDRAW[src_chain.name]["min-balance"]
+            src_chain_balance = item.get_native_balance(chain_name=chains[0])
+
+            # the snapshot is updated locally after every action, the node is only asked close to the threshold
+            if src_chain_balance is None or src_chain_balance <= min_balance * OKX_BALANCE_RECHECK_MARGIN:
+                src_chain_balance = (await client.get_native_balance(chain=src_chain)) / 10 ** 18
+                item.set_native_balance(chain_name=chains[0], balance=src_chain_balance)
+
+            if min_balance >= src_chain_balance:
+                await Warmup.withdraw_from_okx(client=client, chain=src_chain)
+                item.drop_native_balance(chain_name=chains[0])
+
+        spent_before = client.spent[src_chain.name]
 
         if dapp == Merkly:
             dapp = Merkly(client=client, chain=src_chain)
@@ -110,10 +125,49 @@ class Warmup:
 
             result = await dapp.swap_and_bridge(amount=amount_to_use)
 
+        Warmup.update_balances(item=item, chain_names=chains, spent=client.spent[src_chain.name] - spent_before)
+
         if result:
             item.decrease_action_count(action=action, dapp=dapp.name)
             return True
 
+    @staticmethod
+    def update_balances(item: DataItem, chain_names: List[str], spent: int) -> None:
+        """
+        Follows an action in the snapshot without reading balances: the source chain loses what the client
+        spent there, the destination balance is unknown until the bridged funds land.
+        """
+        src_chain_name, dst_chain_name = chain_names
+        src_chain_balance = item.get_native_balance(chain_name=src_chain_name)
+
+        if src_chain_balance is not None:
+            item.set_native_balance(chain_name=src_chain_name, balance=max(src_chain_balance - spent / 10 ** 18, 0))
+
+        item.drop_native_balance(chain_name=dst_chain_name)
+
+    @staticmethod
+    async def withdraw_from_okx(client: Client, chain: Chain) -> bool:
+        amount_to_withdraw = round(
+            random.uniform(*USE_OKX_WITHDRAW[chain.name]["amount"]),
+            ROUND_TO
+        )
+
+        # ccxt is only imported when a withdrawal is actually needed
+        from sdk.okx import OKX
+
+        okx = OKX(
+            api_key=OKX_API_KEY,
+            secret=OKX_API_SECRET,
+            password=OKX_API_PASSWORD,
+            client=client
+        )
+
+        return await okx.withdraw(
+            amount_to_withdraw=amount_to_withdraw,
+            token=chain.coin_symbol,
+            chain=chain
+        )
+
     @staticmethod
     async def uniform_bridge_amount(dapp, action: str):
         if dapp == Stargate:
@@ -1,3 +1,14 @@
 from .logger import logger
-from sdk.client import Client
-from .okx import OKX
+
+
+def __getattr__(name: str):
+    # Client pulls in web3 and OKX pulls in ccxt, so they are imported on first use rather than with the package
+    if name == "Client":
+        from sdk.client import Client
+        return Client
+
+    if name == "OKX":
+        from sdk.okx import OKX
+        return OKX
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,26 +1,52 @@
 from __future__ import annotations
 
+import asyncio
 import random
-from typing import Dict
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Mapping
 
-from aiohttp_proxy import ProxyConnector
 from web3 import AsyncWeb3, Web3
-from web3.contract import Contract
-from web3.middleware import geth_poa_middleware
 
 from config import AFTER_APPROVE_DELAY_RANGE
 from sdk import logger
-from sdk.constants import GAS_MULTIPLIER, RETRIES, APPROVE_VALUE_RANGE
+from sdk.constants import (
+    GAS_MULTIPLIER,
+    RETRIES,
+    APPROVE_VALUE_RANGE,
+    NONCE_ERROR_RETRIES,
+    TX_RECEIPT_TIMEOUT,
+    RPC_READ_RETRY_ATTEMPTS,
+    RPC_READ_RETRY_DEADLINE
+)
+from sdk.contracts import ERC20_ALLOWANCE, ERC20_APPROVE, ERC20_BALANCE_OF
+from sdk.fee_oracle import fee_oracle
 from sdk.models.chain import Chain, EthMainnet
 from sdk.models.token import ETH_Token
-from sdk.utils import retry_on_fail, sleep_pause
+from sdk.nonce_manager import nonce_manager
+from sdk.providers import provider_pool, NoRPCEndpointSpecifiedError
+from sdk.retry import RetryPolicy, ErrorKind, classify_error
+from sdk.utils import sleep_pause
+from sdk.watchers import watcher_pool
+
+read_retry = RetryPolicy(attempts=RPC_READ_RETRY_ATTEMPTS, deadline=RPC_READ_RETRY_DEADLINE)
 
 
 class Client:
-    def __init__(self, private_key: str, proxy: str = None, chain: Chain = EthMainnet) -> None:
+    def __init__(
+            self,
+            private_key: str,
+            proxy: str = None,
+            chain: Chain = EthMainnet,
+            tx_slots: Mapping[str, asyncio.Semaphore] | None = None
+    ) -> None:
         self.private_key = private_key
         self.chain = chain
         self.proxy = proxy
+        # per-chain limits on transactions being sent and confirmed at once, set by the scheduler
+        self.tx_slots = tx_slots
+        # native wei spent per chain by the transactions sent (value plus the max gas cost)
+        self.spent: Dict[str, int] = defaultdict(int)
         self.w3 = self.init_web3(chain=chain)
         self.address = AsyncWeb3.to_checksum_address(
             value=self.w3.eth.account.from_key(private_key=private_key).address
@@ -34,22 +60,27 @@ class Client:
         return self.address
 
     def init_web3(self, chain: Chain = None):
-        request_kwargs = {"proxy": f"http://{self.proxy}"} if self.proxy else {}
-
         try:
-            if not chain.rpc:
-                raise NoRPCEndpointSpecifiedError
-
-            return AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(endpoint_uri=chain.rpc, request_kwargs=request_kwargs))
+            return provider_pool.get_web3(chain=chain, proxy=self.proxy)
 
         except NoRPCEndpointSpecifiedError as e:
             logger.error(e)
-            exit()
+            raise
 
     def change_chain(self, chain: Chain) -> None:
         self.chain = chain
         self.w3 = self.init_web3(chain=chain)
 
+    @asynccontextmanager
+    async def tx_slot(self) -> AsyncIterator[None]:
+        """Held while a transaction of the current chain is sent and confirmed, never during delays."""
+        if self.tx_slots is None:
+            yield
+            return
+
+        async with self.tx_slots[self.chain.name]:
+            yield
+
     async def send_transaction(
             self,
             to: str,
@@ -57,19 +88,50 @@ class Client:
             from_: str = None,
             value: int = None,
     ):
-        tx_params = await self._get_tx_params(
-            to=to, data=data, from_=from_, value=value
-        )
+        for _ in range(NONCE_ERROR_RETRIES + 1):
+            tx_params = await self._get_tx_params(
+                to=to, data=data, from_=from_, value=value
+            )
 
-        tx_params["gas"] = await self._get_gas_estimate(tx_params=tx_params)
+            tx_params["gas"] = await self._get_gas_estimate(tx_params=tx_params)
 
-        sign = self.w3.eth.account.sign_transaction(tx_params, self.private_key)
+            if not tx_params["gas"]:
+                nonce_manager.release_nonce(address=self.address, chain=self.chain, nonce=tx_params["nonce"])
+                return None
 
-        try:
-            return await self.w3.eth.send_raw_transaction(sign.rawTransaction)
+            try:
+                sign = self.w3.eth.account.sign_transaction(tx_params, self.private_key)
+                tx_hash = await self.w3.eth.send_raw_transaction(sign.rawTransaction)
+                self._track_spent(tx_params=tx_params)
+                return tx_hash
+
+            except Exception as e:
+                if nonce_manager.is_already_known_error(e):
+                    # re-signing with a new nonce would broadcast the transaction a second time
+                    logger.warning(f"Transaction is already known to the node: {self.w3.to_hex(sign.hash)}")
+                    self._track_spent(tx_params=tx_params)
+                    return sign.hash
+
+                if nonce_manager.is_nonce_error(e):
+                    logger.warning(f"Nonce error while sending transaction, resyncing nonce: {e}")
+                    nonce_manager.resync(address=self.address, chain=self.chain)
+                    continue
+
+                if classify_error(e) in (ErrorKind.TIMEOUT, ErrorKind.CONNECTION, ErrorKind.SERVER):
+                    # the transaction may have been broadcast anyway, the node knows which nonce is next
+                    nonce_manager.resync(address=self.address, chain=self.chain)
+                else:
+                    nonce_manager.release_nonce(address=self.address, chain=self.chain, nonce=tx_params["nonce"])
+
+                logger.error(f"Error while sending transaction: {e}")
+                return None
 
-        except Exception as e:
-            logger.error(f"Error while sending transaction: {e}")
+        logger.error(f"Error while sending transaction: nonce could not be synced")
+        return None
+
+    def _track_spent(self, tx_params: dict) -> None:
+        gas_price = tx_params.get("maxFeePerGas") or tx_params.get("gasPrice", 0)
+        self.spent[self.chain.name] += tx_params.get("value", 0) + tx_params["gas"] * gas_price
 
     async def _get_gas_estimate(
             self, tx_params: dict, gas_multiplier: float = GAS_MULTIPLIER
@@ -88,8 +150,7 @@ class Client:
             from_ = self.address
 
         tx_params = {
-            "chainId": await self.w3.eth.chain_id,
-            "nonce": await self.w3.eth.get_transaction_count(self.address),
+            "chainId": await nonce_manager.get_chain_id(w3=self.w3, chain=self.chain),
             "from": self.w3.to_checksum_address(from_),
             "to": self.w3.to_checksum_address(to),
         }
@@ -103,26 +164,25 @@ class Client:
         if self.chain.chain_id == 56:
             tx_params["gasPrice"] = Web3.to_wei(1.5, "gwei")
         elif self.chain.eip_1559:
-            w3 = Web3(provider=Web3.HTTPProvider(endpoint_uri=self.chain.rpc))
-            w3.middleware_onion.inject(geth_poa_middleware, layer=0)
-            last_block = w3.eth.get_block("latest")
-            max_priority_fee_per_gas = Client.get_max_priority_fee_per_gas(w3=w3, block=last_block)
-            base_fee = int(last_block["baseFeePerGas"] * GAS_MULTIPLIER)
-            max_fee_per_gas = base_fee + max_priority_fee_per_gas
+            base_fee, max_priority_fee_per_gas = await fee_oracle.get_fees(w3=self.w3, chain=self.chain)
+            max_fee_per_gas = int(base_fee * GAS_MULTIPLIER) + max_priority_fee_per_gas
             tx_params["maxPriorityFeePerGas"] = max_priority_fee_per_gas
             tx_params["maxFeePerGas"] = max_fee_per_gas
         else:
             tx_params["gasPrice"] = await self.w3.eth.gas_price
 
+        # reserved last, so a failed fee lookup doesn't leave a gap in the local nonce counter
+        tx_params["nonce"] = await nonce_manager.reserve_nonce(w3=self.w3, address=self.address, chain=self.chain)
+
         return tx_params
 
     async def verify_tx(self, tx_hash: str) -> bool:
         try:
-            response = await self.w3.eth.wait_for_transaction_receipt(
-                tx_hash, timeout=600
+            receipt = await watcher_pool.get_receipt_watcher(chain=self.chain).wait_for_receipt(
+                tx_hash=self.w3.to_hex(tx_hash), timeout=TX_RECEIPT_TIMEOUT
             )
 
-            if "status" in response and response["status"] == 1:
+            if int(receipt.get("status", "0x0"), 16) == 1:
                 logger.success(
                     f"Transaction was successful: {self.chain.explorer}tx/{self.w3.to_hex(tx_hash)}"
                 )
@@ -133,40 +193,29 @@ class Client:
                 )
                 return False
 
+        except asyncio.TimeoutError:
+            # a dropped transaction leaves a gap later transactions would queue behind
+            nonce_manager.resync(address=self.address, chain=self.chain)
+            logger.error(
+                f"Transaction was not mined in {TX_RECEIPT_TIMEOUT}s: "
+                f"{self.chain.explorer}tx/{self.w3.to_hex(tx_hash)}"
+            )
+            return False
         except Exception as e:
             logger.error(f"Unexpected error in verify_tx function: {e}")
             return False
 
-    @staticmethod
-    def get_max_priority_fee_per_gas(w3: Web3, block: dict) -> int:
-        block_number = block["number"]
-        latest_block_transaction_count = w3.eth.get_block_transaction_count(block_number)
-        max_priority_fee_per_gas_list = []
-        for i in range(latest_block_transaction_count):
-            try:
-                transaction = w3.eth.get_transaction_by_block(block_number, i)
-                if "maxPriorityFeePerGas" in transaction:
-                    max_priority_fee_per_gas_list.append(transaction["maxPriorityFeePerGas"])
-            except Exception:
-                continue
-
-        if not max_priority_fee_per_gas_list:
-            max_priority_fee_per_gas = w3.eth.max_priority_fee
-        else:
-            max_priority_fee_per_gas_list.sort()
-            max_priority_fee_per_gas = max_priority_fee_per_gas_list[len(max_priority_fee_per_gas_list) // 2]
-        return max_priority_fee_per_gas
-
-    @retry_on_fail(tries=RETRIES)
+    @read_retry
     async def get_allowance(
-            self, token_contract: Contract, spender: str, owner: str = None
-    ) -> float:
+            self, token_address: str, spender: str, owner: str = None
+    ) -> int:
         if not owner:
             owner = self.address
 
-        return await token_contract.functions.allowance(owner, spender).call()
+        result = await self.w3.eth.call({"to": token_address, "data": ERC20_ALLOWANCE.encode(owner, spender)})
+        return ERC20_ALLOWANCE.decode(result)[0]
 
-    @retry_on_fail(tries=RETRIES)
+    @read_retry
     async def get_native_balance(self, chain: Chain):
         w3 = self.init_web3(chain=chain)
 
@@ -176,7 +225,7 @@ class Client:
             logger.exception(f"[CLIENT] Could not get balance of: {self.address}: {e}")
             return None
 
-    @retry_on_fail(tries=RETRIES)
+    @RetryPolicy(attempts=RETRIES)
     async def approve(
             self, spender: str, token, value: int = None, ignore_allowance: bool = False
     ) -> bool:
@@ -186,8 +235,8 @@ class Client:
         if token.is_native_token_mapping[self.chain.name]:
             return True
 
-        token_contract = self.w3.eth.contract(address=token.chain_to_contract_mapping[self.chain.name], abi=token.abi)
-        allowance = await self.get_allowance(token_contract=token_contract, spender=spender)
+        token_address = Web3.to_checksum_address(token.chain_to_contract_mapping[self.chain.name])
+        allowance = await self.get_allowance(token_address=token_address, spender=spender)
 
         if self.chain.chain_id == 56 and token.symbol == "USDT":
             decimals = 18
@@ -202,32 +251,35 @@ class Client:
 
         logger.info(f"Approving {value / pow(10, decimals)} {token.symbol} for spender: {spender}")
 
-        response = token_contract.encodeABI("approve", args=(spender, value))
-        tx_hash = await self.send_transaction(token_contract.address, data=response)
+        response = ERC20_APPROVE.encode(spender, value)
 
-        if await self.verify_tx(tx_hash=tx_hash):
+        async with self.tx_slot():
+            tx_hash = await self.send_transaction(token_address, data=response)
+            verified = await self.verify_tx(tx_hash=tx_hash)
+
+        if verified:
             await sleep_pause(delay_range=AFTER_APPROVE_DELAY_RANGE)
             return True
 
         logger.error("Error in approve transaction")
         return False
 
-    @retry_on_fail(tries=RETRIES)
+    @read_retry
     async def get_token_balance(self, token):
         if token.is_native_token_mapping[self.chain.name]:
-            balance = await self.get_native_balance()
+            balance = await self.get_native_balance(chain=self.chain)
 
-            if not balance:
+            # a zero balance is a valid result, only a failed read is retried
+            if balance is None:
                 return None
 
             return float(self.w3.from_wei(balance, "ether"))
 
-        token_contract = self.w3.eth.contract(
-            address=token.chain_to_contract_mapping[self.chain.name], abi=token.abi
-        )
+        token_address = Web3.to_checksum_address(token.chain_to_contract_mapping[self.chain.name])
 
         try:
-            balance = await token_contract.functions.balanceOf(self.address).call()
+            result = await self.w3.eth.call({"to": token_address, "data": ERC20_BALANCE_OF.encode(self.address)})
+            balance = ERC20_BALANCE_OF.decode(result)[0]
         except Exception as e:
             logger.error(f"Exception in get_token_balance function: {e}")
             return None
@@ -239,19 +291,3 @@ class Client:
 
         return balance_from_wei
 
-    def get_proxy_connector(self):
-        if self.proxy is not None:
-            proxy_url = f"http://{self.proxy}"
-            return ProxyConnector.from_url(url=proxy_url)
-        else:
-            return None
-
-
-class NoRPCEndpointSpecifiedError(Exception):
-    def __init__(
-            self,
-            message: str = "No RPC endpoint specified. Specify one in config.py file",
-            *args: object,
-    ) -> None:
-        self.message = message
-        super().__init__(self.message, *args)
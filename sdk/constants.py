@@ -1,3 +1,4 @@
+import functools
 import os
 import sys
 from pathlib import Path
@@ -20,27 +21,114 @@ PROXIES_PATH = "data/proxies.txt"
 # path to deposit_addresses.txt file
 DEPOSIT_ADDRESSES_PATH = "data/deposit_addresses.txt"
 
-# path to a database.json file
-DATABASE_PATH = "data/database.json"
+# path to a database file
+DATABASE_PATH = "data/database.db"
+
+# path to a legacy database.json file, migrated into DATABASE_PATH on first load
+DATABASE_JSON_PATH = "data/database.json"
+
+# number of items read from the database at once in streaming mode
+DATABASE_STREAM_CHUNK_SIZE = 500
 
 GAS_MULTIPLIER = 1.2
 
 RETRIES = 1
 
+# retry policies: delays grow as RETRY_BACKOFF_BASE * 2 ** attempt up to RETRY_BACKOFF_MAX, with jitter
+RETRY_BACKOFF_BASE = 1
+
+RETRY_BACKOFF_MAX = 30
+
+# rate limit errors back off this many times longer than other transient errors
+RETRY_RATE_LIMIT_BACKOFF_MULTIPLIER = 4
+
+RPC_READ_RETRY_ATTEMPTS = 3
+
+# seconds after which an RPC read stops being retried
+RPC_READ_RETRY_DEADLINE = 30
+
 APPROVE_VALUE_RANGE = None
 
+# shared RPC sessions
+RPC_CONNECTION_LIMIT = 100
+
+RPC_CONNECTION_LIMIT_PER_HOST = 20
+
+RPC_KEEPALIVE_TIMEOUT = 60
+
+RPC_REQUEST_TIMEOUT = 30
+
+# RPC endpoint health tracking and failover
+RPC_HEALTH_EWMA_ALPHA = 0.2
+
+RPC_MAX_ERROR_RATE = 0.5
+
+RPC_FAILURE_COOLDOWN = 60
+
+# a read is also sent to the next endpoint if the first one hasn't answered
+# in max(RPC_HEDGE_MIN_DELAY, RPC_HEDGE_LATENCY_MULTIPLIER * its average latency) seconds
+RPC_HEDGE_MIN_DELAY = 1
+
+RPC_HEDGE_LATENCY_MULTIPLIER = 3
+
+# never hedged, and only sent to the next endpoint if the previous one couldn't be connected to,
+# so a signed transaction is not broadcast twice
+RPC_WRITE_METHODS = ("eth_sendRawTransaction", "eth_sendTransaction")
+
+# block / receipt watchers
+BLOCK_POLL_MIN_INTERVAL = 1
+
+BLOCK_POLL_MAX_INTERVAL = 15
+
+# at most this many missed blocks are fetched when the watcher falls behind
+BLOCK_WATCHER_MAX_CATCHUP = 20
+
+BLOCK_WATCHER_ERROR_DELAY = 5
+
+# receipts of all pending transactions are re-requested every N blocks in case a block was skipped
+RECEIPT_RECHECK_BLOCKS = 10
+
+TX_RECEIPT_TIMEOUT = 600
+
+# send errors after which the local nonce is re-synced from the node
+NONCE_ERROR_MESSAGES = (
+    "nonce too low",
+    "nonce too high",
+    "invalid nonce",
+    "replacement transaction underpriced",
+)
+
+# send errors meaning this exact signed transaction is already in the mempool, it counts as sent
+TX_ALREADY_KNOWN_MESSAGES = (
+    "already known",
+    "known transaction",
+)
+
+NONCE_ERROR_RETRIES = 1
+
+# EIP-1559 fee oracle
+FEE_ORACLE_FEE_HISTORY = "fee_history"
+
+FEE_ORACLE_MAX_PRIORITY_FEE = "max_priority_fee"
+
+FEE_ORACLE_TTL = 3
+
+FEE_HISTORY_BLOCK_COUNT = 5
+
+FEE_HISTORY_REWARD_PERCENTILE = 50
+
 # tokens abis
-FIAT_TOKEN_ABI = read_from_json(os.path.join(ABI_DIR, "fiat_token_abi.json"))
-L2_ETH_TOKEN_ABI = read_from_json(os.path.join(ABI_DIR, "l2_eth_token_abi.json"))
+FIAT_TOKEN_ABI_FILE = "fiat_token_abi.json"
+L2_ETH_TOKEN_ABI_FILE = "l2_eth_token_abi.json"
 
 # stargate
 STG_TOKEN_CONTRACT_ADDRESS = "0x2F6F07CDcf3588944Bf4C42aC74ff24bF56e7590"
-STG_TOKEN_ABI = read_from_json(os.path.join(ABI_DIR, "stg_token_abi.json"))
+STG_TOKEN_ABI_FILE = "stg_token_abi.json"
 
 # merkly
 MERKLY_MINTER_MB_CONTRACT_ADDRESS = "0x766b7aC73b0B33fc282BdE1929db023da1fe6458"
 MERKLY_MINTER_MR_CONTRACT_ADDRESS = "0x97337A9710BEB17b8D77cA9175dEFBA5e9AFE62e"
-MERKLY_MINTER_ABI = read_from_json(os.path.join(ABI_DIR, "merkly_minter_abi.json"))
+MERKLY_MINTER_ABI_FILE = "merkly_minter_abi.json"
 
 MERKLY_CHAIN_TO_REFUEL_CONTRACT_ADDRESS = {
     "BSC": "0xeF1eAE0457e8D56A003d781569489Bc5466E574b",
@@ -53,19 +141,33 @@ MERKLY_CHAIN_TO_REFUEL_CONTRACT_ADDRESS = {
     "Conflux": "0xE47b05F2026a82048caAECf5caE58e5AAE2405eA"
 }
 
-MERKLY_REFUEL_ABI = read_from_json(os.path.join(ABI_DIR, "merkly_refuel_abi.json"))
+MERKLY_REFUEL_ABI_FILE = "merkly_refuel_abi.json"
 
 # core bridge
 BSC_USDT_CONTRACT_ADDRESS = "0x55d398326f99059fF775485246999027B3197955"
 
 CORE_BRIDGE_CONTRACT_ADDRESS = "0x52e75D318cFB31f9A2EdFa2DFee26B161255B233"
-CORE_BRIDGE_ABI = read_from_json(os.path.join(ABI_DIR, "core_bridge_abi.json"))
+CORE_BRIDGE_ABI_FILE = "core_bridge_abi.json"
 
 # USDC
 GNOSIS_USDC_CONTRACT_ADDRESS = "0xDDAfbb505ad214D7b80b1f830fcCc89B60fb7A83"
 POLYGON_USDC_CONTRACT_ADDRESS = "0x3c499c542cEF5E3811e1192ce70d8cC03d5c3359"
 
-USDC_CONTRACT_ABI = read_from_json(os.path.join(ABI_DIR, "usdc_token_abi.json"))
+USDC_CONTRACT_ABI_FILE = "usdc_token_abi.json"
+
+# multicall
+MULTICALL3_CONTRACT_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+MULTICALL3_ABI_FILE = "multicall3_abi.json"
+
+# max number of addresses queried by a single multicall / JSON-RPC batch request
+BALANCES_BATCH_SIZE = 500
+
+# 0x API
+ZEROX_MAX_ATTEMPTS = 10
+
+ZEROX_BACKOFF_BASE = 1
+
+ZEROX_BACKOFF_MAX = 30
 
 # GNOSIS GAS
 GNOSIS_GAS_CHECKUP_SLEEP_TIME_RANGE = [5, 10]
@@ -77,6 +179,8 @@ NATIVE_TOKEN_CONTRACT_ADDRESS = "0xEeeeeEeeeEeEeeEeEeEeeEEEeeeeEeeeeeeeEEeE"
 ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
 
 # OKX
+OKX_API_URL = "https://www.okx.com"
+
 OKX_WITHDRAWAL_CHAIN_TO_DATA = {
     "BSC": {
         "fee": 0.002,
@@ -104,14 +208,53 @@ OKX_ON_FAIL_RETRY_COUNT = 5
 
 OKX_AFTER_ERROR_SLEEP_TIME = [60, 60]
 
-OKX_WAIT_FOR_WITHDRAWAL_FINAL_STATUS_MAX_WAIT_TIME = [10, 10]
+# one withdrawal history request per interval covers every pending withdrawal
+OKX_WITHDRAWAL_STATUS_POLL_INTERVAL = 10
 
-OKX_WAIT_FOR_WITHDRAWAL_FINAL_STATUS_ATTEMPTS = 100
+OKX_WITHDRAWAL_FINAL_STATUS_TIMEOUT = 1000
 
-OKX_WAIT_FOR_WITHDRAWAL_RECEIVED_ATTEMPTS = 100
+# records per withdrawal history page, withdrawals missing from a full page are queried by wdId
+OKX_WITHDRAWAL_HISTORY_LIMIT = 100
 
-OKX_WAIT_FOR_WITHDRAWAL_RECIEVED_SLEEP_TIME = [60, 60]
+# withdrawal history states, every other state means the withdrawal is still in progress
+OKX_WITHDRAWAL_SUCCESS_STATES = ("2",)
+OKX_WITHDRAWAL_FAILED_STATES = ("-1", "-2")
+
+# withdrawn funds are detected by the chain's funds watcher, which checks balances once per block
+OKX_WITHDRAWAL_RECEIVED_TIMEOUT = 6000
+
+# before a bridge the source balance is only read from the node when the locally updated snapshot is missing
+# or below min-balance * this margin
+OKX_BALANCE_RECHECK_MARGIN = 2
+
+# the scheduler keeps at most MAX_PENDING_WITHDRAWALS * this many wallets waiting to be funded
+PREFUND_BACKLOG_MULTIPLIER = 4
 
 WAIT_FOR_BRIDGED_FUNDS_SLEEP_TIME = [60, 60]
 
 MAX_LEFT_TOKEN_PERCENTAGE = 0.0000001
+
+# cached LayerZero fee quotes are also refreshed once the source chain has moved this many blocks
+LZ_FEE_QUOTE_MAX_BLOCKS = 20
+
+# seconds a block number read for the fee quotes is reused, when no block watcher follows the chain
+LZ_FEE_QUOTE_BLOCK_NUMBER_TTL = 5
+
+# number of failed actions in a row after which the concurrent scheduler leaves a wallet for the next run
+WARMUP_MAX_FAILED_ACTIONS = 5
+
+
+@functools.lru_cache(maxsize=None)
+def load_abi(file_name: str) -> list:
+    return read_from_json(os.path.join(ABI_DIR, file_name))
+
+
+def __getattr__(name: str):
+    # ABIs are parsed on first access (FIAT_TOKEN_ABI -> FIAT_TOKEN_ABI_FILE), not when constants are imported;
+    # load_abi is cached, so every access returns the same list
+    file_name = globals().get(f"{name}_FILE")
+
+    if name.endswith("_ABI") and file_name:
+        return load_abi(file_name)
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Sequence, Tuple
+
+from eth_abi import decode, encode
+from eth_utils.abi import collapse_if_tuple, function_abi_to_4byte_selector, function_signature_to_4byte_selector
+from web3 import AsyncWeb3, Web3
+from web3.contract import AsyncContract
+
+from sdk import constants
+
+
+class FunctionEncoder:
+    """
+    Calldata template of one contract function: the selector and argument types are resolved once,
+    so encoding a call is a single eth_abi.encode instead of a full web3 ABI lookup.
+    """
+
+    def __init__(self, selector: bytes, types: List[str], output_types: List[str]) -> None:
+        self.selector = selector
+        self.types = types
+        self.output_types = output_types
+
+    @classmethod
+    def from_abi(cls, abi: list, name: str) -> FunctionEncoder:
+        function_abi = next(item for item in abi if item.get("type") == "function" and item.get("name") == name)
+
+        return cls(
+            selector=function_abi_to_4byte_selector(function_abi),
+            types=[collapse_if_tuple(item) for item in function_abi["inputs"]],
+            output_types=[collapse_if_tuple(item) for item in function_abi.get("outputs", [])]
+        )
+
+    @classmethod
+    def from_signature(cls, signature: str, output_types: Sequence[str] = ()) -> FunctionEncoder:
+        """Only for signatures without tuple arguments, e.g. "approve(address,uint256)"."""
+        types = signature[signature.index("(") + 1:-1]
+
+        return cls(
+            selector=function_signature_to_4byte_selector(signature),
+            types=types.split(",") if types else [],
+            output_types=list(output_types)
+        )
+
+    def encode(self, *args: Any) -> str:
+        values = [self._normalize(abi_type, value) for abi_type, value in zip(self.types, args)]
+        return Web3.to_hex(self.selector + encode(self.types, values))
+
+    def decode(self, data: bytes) -> Tuple:
+        return decode(self.output_types, data)
+
+    @staticmethod
+    def _normalize(abi_type: str, value: Any) -> Any:
+        # web3 accepts hex strings (including addresses) for bytes arguments, eth_abi only accepts bytes
+        if abi_type.startswith("bytes") and isinstance(value, str):
+            return Web3.to_bytes(hexstr=value)
+
+        return value
+
+
+class ContractCache:
+    """Contract objects per (web3 instance, address, abi), so large ABIs are only parsed once per chain."""
+
+    def __init__(self) -> None:
+        self._contracts: Dict[Tuple[AsyncWeb3, str, int], AsyncContract] = {}
+
+    def get_contract(self, w3: AsyncWeb3, address: str, abi: list) -> AsyncContract:
+        # ABIs are module-level constants, so their id is stable for the whole run
+        key = (w3, address, id(abi))
+
+        if key not in self._contracts:
+            self._contracts[key] = w3.eth.contract(address=address, abi=abi)
+
+        return self._contracts[key]
+
+    def clear(self) -> None:
+        self._contracts.clear()
+
+
+contract_cache = ContractCache()
+
+ERC20_APPROVE = FunctionEncoder.from_signature("approve(address,uint256)", output_types=["bool"])
+ERC20_BALANCE_OF = FunctionEncoder.from_signature("balanceOf(address)", output_types=["uint256"])
+ERC20_ALLOWANCE = FunctionEncoder.from_signature("allowance(address,address)", output_types=["uint256"])
+
+# encoders taken from large ABIs, built on first access so that importing this module doesn't parse them
+ABI_ENCODERS = {
+    "MERKLY_BRIDGE_GAS": ("MERKLY_REFUEL_ABI", "bridgeGas"),
+    "STG_SEND_TOKENS": ("STG_TOKEN_ABI", "sendTokens"),
+    "CORE_BRIDGE": ("CORE_BRIDGE_ABI", "bridge"),
+}
+
+
+def __getattr__(name: str) -> FunctionEncoder:
+    if name not in ABI_ENCODERS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    abi_name, function_name = ABI_ENCODERS[name]
+    encoder = globals()[name] = FunctionEncoder.from_abi(getattr(constants, abi_name), function_name)
+
+    return encoder
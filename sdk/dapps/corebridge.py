@@ -4,12 +4,17 @@ from config import TX_DELAY_RANGE, USE_SWAP_BEFORE_BRIDGE, ROUND_TO, TOKEN_USE_P
 from sdk import Client, logger
 from sdk.constants import CORE_BRIDGE_CONTRACT_ADDRESS, CORE_BRIDGE_ABI
 from sdk.dapps import ZeroX
+from sdk.contracts import contract_cache, CORE_BRIDGE
 from sdk.decorators import wait
+from sdk.fee_quotes import lz_fee_quotes, BridgeFeeTooHighError
 from sdk.models.chain import Chain, BSC
 from sdk.models.token import USDT_Token, BNB_Token
 
 
 class CoreBridge:
+    route = ("BSC-Core", "CoreBridge")
+    fee_args = (True, '0x')
+
     def __init__(self, client: Client, chain: Chain = BSC):
         self.name = "CoreBridge"
         self.account = client
@@ -17,11 +22,19 @@ class CoreBridge:
         if self.account.chain != chain:
             self.account.change_chain(chain)
 
-        self.bridge_contract = self.account.w3.eth.contract(
-            abi=CORE_BRIDGE_ABI,
-            address=CORE_BRIDGE_CONTRACT_ADDRESS
+        self.bridge_contract = contract_cache.get_contract(
+            w3=self.account.w3,
+            address=CORE_BRIDGE_CONTRACT_ADDRESS,
+            abi=CORE_BRIDGE_ABI
         )
 
+    async def get_bridge_fee(self, fee_args: tuple) -> int:
+        async def fetch() -> int:
+            native_fee = await self.bridge_contract.functions.estimateBridgeFee(*fee_args).call()
+            return native_fee[0]
+
+        return await lz_fee_quotes.get_fee(key=("CoreBridge", BSC.name, fee_args), chain=BSC, fetch=fetch)
+
     @wait(delay_range=TX_DELAY_RANGE)
     async def bridge(self, amount: float | None = None):
         try:
@@ -29,6 +42,10 @@ class CoreBridge:
                 amount = (await self.account.get_token_balance(USDT_Token) * (1 - 0.01)) / 10 ** 12
             value = int(amount * 10 ** 18)
 
+            # checked before the approve, so a skipped route doesn't pay for one
+            native_fee = await self.get_bridge_fee(fee_args=self.fee_args)
+            lz_fee_quotes.check_max_fee(route=self.route, chain=BSC, fee=native_fee)
+
             if not await self.account.approve(spender=CORE_BRIDGE_CONTRACT_ADDRESS, token=USDT_Token, value=value):
                 logger.error(f"[{self.name}] Failed to approve.")
                 return False
@@ -43,18 +60,23 @@ class CoreBridge:
                 '0x'
             )
 
-            fee_args = (True, '0x')
-            data = self.bridge_contract.encodeABI('bridge', args=data_args)
+            data = CORE_BRIDGE.encode(*data_args)
 
-            native_fee: list = await self.bridge_contract.functions.estimateBridgeFee(*fee_args).call()
-            tx = await self.account.send_transaction(to=CORE_BRIDGE_CONTRACT_ADDRESS, data=data, value=native_fee[0])
-            if tx:
-                return await self.account.verify_tx(tx_hash=tx)
+            async with self.account.tx_slot():
+                tx = await self.account.send_transaction(to=CORE_BRIDGE_CONTRACT_ADDRESS, data=data, value=native_fee)
+                if tx:
+                    return await self.account.verify_tx(tx_hash=tx)
             return False
+        except BridgeFeeTooHighError:
+            raise
         except Exception as ex:
             logger.error(f"[{self.name}] Error while bridging: {ex}")
 
     async def swap_and_bridge(self, amount: float):
+        # checked before the swap as well, so a skipped route doesn't leave swapped USDT behind
+        native_fee = await self.get_bridge_fee(fee_args=self.fee_args)
+        lz_fee_quotes.check_max_fee(route=self.route, chain=BSC, fee=native_fee)
+
         zerox = ZeroX(client=self.account, chain=self.account.chain)
 
         usdt_balance = await self.account.get_token_balance(USDT_Token)
@@ -1,6 +1,10 @@
+import asyncio
+
 from eth_abi.packed import encode_packed
+from web3 import Web3
+from web3.contract import AsyncContract
 
-from config import TX_DELAY_RANGE
+from config import TX_DELAY_RANGE, MERKLY_TX_COUNT
 from sdk import Client, logger
 from sdk.constants import (
     MERKLY_CHAIN_TO_REFUEL_CONTRACT_ADDRESS,
@@ -8,9 +12,14 @@ from sdk.constants import (
     RETRIES
 )
 from sdk.decorators import wait
-from ..models.chain import Chain
+from ..contracts import contract_cache, MERKLY_BRIDGE_GAS
+from ..fee_quotes import lz_fee_quotes, BridgeFeeTooHighError
+from ..models.chain import Chain, NAMES_TO_CHAINS
 from ..models.token import ETH_Token
-from ..utils import retry_on_fail
+from ..providers import provider_pool
+from ..retry import RetryPolicy
+
+CHAINS_TO_NAMES = {chain.name: name for name, chain in NAMES_TO_CHAINS.items()}
 
 
 class Merkly:
@@ -22,23 +31,88 @@ class Merkly:
             self.account.change_chain(chain=chain)
 
         self.refuel_address = MERKLY_CHAIN_TO_REFUEL_CONTRACT_ADDRESS[chain.name]
-        self.contract = self.account.w3.eth.contract(
+        self.contract = contract_cache.get_contract(
+            w3=self.account.w3,
             address=self.refuel_address,
             abi=MERKLY_REFUEL_ABI
         )
 
-    @retry_on_fail(tries=RETRIES)
-    async def get_bridge_fee_params(self, dst_chain_id: int, value: int):
-        data = self.account.w3.to_hex(
-            encode_packed(
-                ["uint16", "uint", "uint", "address"],
-                [2, 250000, value, self.account.address]
-            )
+    @staticmethod
+    def get_adapter_params(value: int, address: str) -> str:
+        return Web3.to_hex(encode_packed(["uint16", "uint", "uint", "address"], [2, 250000, value, address]))
+
+    @staticmethod
+    def get_quote_value(src_chain: Chain, dst_chain: Chain, value: int) -> int:
+        """
+        Fees are quoted for the top of the route's amount range, so one cached quote covers every amount
+        of the route; LayerZero refunds the unused part of the fee.
+        """
+        route = MERKLY_TX_COUNT.get(CHAINS_TO_NAMES[src_chain.name], {}).get(CHAINS_TO_NAMES[dst_chain.name])
+
+        if not route:
+            return value
+
+        return max(value, ETH_Token.to_wei(route["amount-range"][1]))
+
+    @staticmethod
+    async def quote_fee(contract: AsyncContract, src_chain: Chain, dst_chain: Chain, value: int) -> int:
+        quote_value = Merkly.get_quote_value(src_chain=src_chain, dst_chain=dst_chain, value=value)
+
+        async def fetch() -> int:
+            # the fee doesn't depend on the receiver, so any address will do for the quote
+            adapter_params = Merkly.get_adapter_params(value=quote_value, address=contract.address)
+            fee = await contract.functions.estimateSendFee(dst_chain.lz_chain_id, '0x', adapter_params).call()
+            return fee[0]
+
+        return await lz_fee_quotes.get_fee(
+            key=("Merkly", src_chain.name, dst_chain.name, quote_value),
+            chain=src_chain,
+            fetch=fetch
         )
 
-        fee = await self.contract.functions.estimateSendFee(dst_chain_id, '0x', data).call()
+    @staticmethod
+    def get_route(src_chain: Chain, dst_chain: Chain) -> tuple[str, str]:
+        return f"{CHAINS_TO_NAMES[src_chain.name]}-{CHAINS_TO_NAMES[dst_chain.name]}", "Merkly"
 
-        return data, int(fee[0] * 1.01)
+    @staticmethod
+    async def prefetch_fees() -> None:
+        """
+        Quotes every Merkly route with transactions left in MERKLY_TX_COUNT, so wallets start with a warm cache
+        and routes above MAX_BRIDGE_FEE are skipped before they are picked.
+        """
+        routes = [
+            (NAMES_TO_CHAINS[src_chain_name], NAMES_TO_CHAINS[dst_chain_name])
+            for src_chain_name, dst_chains in MERKLY_TX_COUNT.items()
+            if src_chain_name in MERKLY_CHAIN_TO_REFUEL_CONTRACT_ADDRESS
+            for dst_chain_name, route in dst_chains.items()
+            if route["tx-range"][1] > 0
+        ]
+
+        async def prefetch(src_chain: Chain, dst_chain: Chain) -> None:
+            try:
+                contract = contract_cache.get_contract(
+                    w3=provider_pool.get_web3(chain=src_chain),
+                    address=MERKLY_CHAIN_TO_REFUEL_CONTRACT_ADDRESS[src_chain.name],
+                    abi=MERKLY_REFUEL_ABI
+                )
+                fee = await Merkly.quote_fee(contract=contract, src_chain=src_chain, dst_chain=dst_chain, value=0)
+                lz_fee_quotes.check_max_fee(
+                    route=Merkly.get_route(src_chain=src_chain, dst_chain=dst_chain), chain=src_chain, fee=fee
+                )
+            except BridgeFeeTooHighError as e:
+                logger.warning(f"[Merkly] {e}", send_to_tg=False)
+            except Exception as e:
+                logger.warning(f"[Merkly] Couldn't quote {src_chain.name}-{dst_chain.name} fee: {e}", send_to_tg=False)
+
+        await asyncio.gather(*[prefetch(src_chain=src_chain, dst_chain=dst_chain) for src_chain, dst_chain in routes])
+        logger.info(f"[Merkly] Prefetched fees for {len(routes)} routes", send_to_tg=False)
+
+    @RetryPolicy(attempts=RETRIES)
+    async def get_bridge_fee_params(self, src_chain: Chain, dst_chain: Chain, value: int):
+        data = self.get_adapter_params(value=value, address=self.account.address)
+        fee = await self.quote_fee(contract=self.contract, src_chain=src_chain, dst_chain=dst_chain, value=value)
+
+        return data, int(fee * 1.01)
 
     @wait(delay_range=TX_DELAY_RANGE)
     async def bridge(self, src_chain: Chain, dst_chain: Chain, amount: float) -> bool:
@@ -49,22 +123,28 @@ class Merkly:
 
         try:
             value = ETH_Token.to_wei(amount)
-            adapter_params, fee = await self.get_bridge_fee_params(dst_chain.lz_chain_id, value=value)
+            adapter_params, fee = await self.get_bridge_fee_params(
+                src_chain=src_chain, dst_chain=dst_chain, value=value
+            )
+
+            lz_fee_quotes.check_max_fee(
+                route=self.get_route(src_chain=src_chain, dst_chain=dst_chain), chain=src_chain, fee=fee
+            )
 
             amount = ETH_Token.from_wei(fee)
             if balance < amount:
                 logger.error(f"[{self.name}] Insufficient balance to bridge: {balance} < {amount}")
                 return False
 
-            data = self.contract.encodeABI('bridgeGas', args=(
-                dst_chain.lz_chain_id,
-                self.account.address,
-                adapter_params
-            ))
+            data = MERKLY_BRIDGE_GAS.encode(dst_chain.lz_chain_id, self.account.address, adapter_params)
 
-            tx_hash = await self.account.send_transaction(to=self.refuel_address, data=data, value=fee)
-            if tx_hash:
-                return await self.account.verify_tx(tx_hash=tx_hash)
+            async with self.account.tx_slot():
+                tx_hash = await self.account.send_transaction(to=self.refuel_address, data=data, value=fee)
+                if tx_hash:
+                    return await self.account.verify_tx(tx_hash=tx_hash)
+        except BridgeFeeTooHighError:
+            # a skipped route is not a failed action, it neither sleeps nor counts towards the failures
+            raise
         except Exception as e:
             if "dstNativeAmt too large" in str(e):
                 logger.error(
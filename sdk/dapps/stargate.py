@@ -4,13 +4,17 @@ from config import TX_DELAY_RANGE, TOKEN_USE_PERCENTAGE, ROUND_TO, USE_SWAP_BEFO
 from sdk import Client, logger
 from sdk.constants import STG_TOKEN_CONTRACT_ADDRESS, ZERO_ADDRESS, STG_TOKEN_ABI
 from sdk.dapps import ZeroX
+from sdk.contracts import contract_cache, STG_SEND_TOKENS
 from sdk.decorators import wait
+from sdk.fee_quotes import lz_fee_quotes, BridgeFeeTooHighError
 from sdk.models.chain import Chain
 from sdk.models.chain import Polygon, Kava
 from sdk.models.token import ETH_Token, MATIC_Token, STG_Token
 
 
 class Stargate:
+    route = ("Polygon-Kava", "Stargate")
+
     def __init__(self, client: Client, chain: Chain = Polygon):
         self.account = client
         self.name = "Stargate"
@@ -18,15 +22,21 @@ class Stargate:
         if self.account.chain != chain:
             self.account.change_chain(chain=chain)
 
-        self.contract = self.account.w3.eth.contract(
-            abi=STG_TOKEN_ABI,
-            address=STG_TOKEN_CONTRACT_ADDRESS
+        self.contract = contract_cache.get_contract(
+            w3=self.account.w3,
+            address=STG_TOKEN_CONTRACT_ADDRESS,
+            abi=STG_TOKEN_ABI
         )
 
     async def get_bridge_fee_params(self):
         data = self.account.w3.to_hex(encode_packed(["uint16", "uint"], [1, 85000]))
-        fee = await self.contract.functions.estimateSendTokensFee(177, False, data).call()
-        return data, int(fee[0] * 1.01)
+
+        async def fetch() -> int:
+            fee = await self.contract.functions.estimateSendTokensFee(Kava.lz_chain_id, False, data).call()
+            return fee[0]
+
+        fee = await lz_fee_quotes.get_fee(key=("Stargate", Polygon.name, Kava.name), chain=Polygon, fetch=fetch)
+        return data, int(fee * 1.01)
 
     @wait(delay_range=TX_DELAY_RANGE)
     async def bridge(self, amount: float):
@@ -34,25 +44,33 @@ class Stargate:
             value = ETH_Token.to_wei(amount)
 
             adapter_params, fee = await self.get_bridge_fee_params()
+            lz_fee_quotes.check_max_fee(route=self.route, chain=Polygon, fee=fee)
 
-            data = self.contract.encodeABI('sendTokens', args=(
+            data = STG_SEND_TOKENS.encode(
                 Kava.lz_chain_id,
                 self.account.address,
                 value,
                 ZERO_ADDRESS,
                 adapter_params
-            ))
+            )
 
             logger.info(f"[{self.name}] Bridging {amount} STG from {Polygon.name} to {Kava.name}")
-            tx_hash = await self.account.send_transaction(to=STG_TOKEN_CONTRACT_ADDRESS, data=data, value=fee)
-            if tx_hash:
-                if await self.account.verify_tx(tx_hash=tx_hash):
-                    return True
+            async with self.account.tx_slot():
+                tx_hash = await self.account.send_transaction(to=STG_TOKEN_CONTRACT_ADDRESS, data=data, value=fee)
+                if tx_hash:
+                    if await self.account.verify_tx(tx_hash=tx_hash):
+                        return True
             return False
+        except BridgeFeeTooHighError:
+            raise
         except Exception as ex:
             logger.error(f"[{self.name}] Error while bridging: {ex}")
 
     async def swap_and_bridge(self, amount: float):
+        # checked before the swap as well, so a skipped route doesn't leave swapped STG behind
+        _, fee = await self.get_bridge_fee_params()
+        lz_fee_quotes.check_max_fee(route=self.route, chain=Polygon, fee=fee)
+
         zerox = ZeroX(client=self.account, chain=self.account.chain)
 
         stg_balance = await self.account.get_token_balance(STG_Token)
@@ -1,17 +1,41 @@
-import asyncio
-
-import aiohttp
 from web3 import Web3
 
 from config import ZEROX_API_KEY, MAX_SLIPPAGE, TX_DELAY_RANGE
 from sdk.client import Client
+from sdk.constants import (
+    ZEROX_MAX_ATTEMPTS,
+    ZEROX_BACKOFF_BASE,
+    ZEROX_BACKOFF_MAX
+)
 from sdk.decorators import wait
 from sdk.logger import logger
 from sdk.models.chain import Chain
 from sdk.models.token import Token
+from sdk.providers import provider_pool
+from sdk.proxy_rotation import proxy_rotator
+from sdk.rate_limiter import rate_limiter
+from sdk.retry import RetryPolicy
+
+zerox_retry = RetryPolicy(
+    attempts=ZEROX_MAX_ATTEMPTS,
+    backoff_base=ZEROX_BACKOFF_BASE,
+    backoff_max=ZEROX_BACKOFF_MAX,
+    retry_on_falsy=False
+)
 
 
 class ZeroX:
+    url_chains = {
+        'ethereum': '',
+        'bsc': 'bsc.',
+        'arbitrum': 'arbitrum.',
+        'optimism': 'optimism.',
+        'polygon': 'polygon.',
+        'fantom': 'fantom.',
+        'avalanche': 'avalanche.',
+        'celo': 'celo.',
+    }
+
     def __init__(self, client: Client, chain: Chain):
         self.account = client
         self.name = "0x"
@@ -19,51 +43,40 @@ class ZeroX:
         if self.account.chain != chain:
             self.account.change_chain(chain)
 
+    def _get_api_url(self, endpoint: str) -> str:
+        return f'https://{self.url_chains[self.account.chain.name.lower()]}api.0x.org/swap/v1/{endpoint}'
+
     async def get_0x_quote(self, value, from_token: Token, to_token: Token):
-        from_token = from_token.chain_to_contract_mapping[self.account.chain.name]
-        to_token = to_token.chain_to_contract_mapping[self.account.chain.name]
-
-        url_chains = {
-            'ethereum': '',
-            'bsc': 'bsc.',
-            'arbitrum': 'arbitrum.',
-            'optimism': 'optimism.',
-            'polygon': 'polygon.',
-            'fantom': 'fantom.',
-            'avalanche': 'avalanche.',
-            'celo': 'celo.',
+        params = {
+            'buyToken': to_token.chain_to_contract_mapping[self.account.chain.name],
+            'sellToken': from_token.chain_to_contract_mapping[self.account.chain.name],
+            'sellAmount': value,
+            'slippagePercentage': MAX_SLIPPAGE / 100
         }
 
-        url = f'https://{url_chains[self.account.chain.name.lower()]}' \
-              f'api.0x.org/swap/v1/quote?' \
-              f'buyToken={to_token}' \
-              f'&sellToken={from_token}' \
-              f'&sellAmount={value}' \
-              f'&slippagePercentage={MAX_SLIPPAGE / 100}'
-
-        headers = {'0x-api-key': ZEROX_API_KEY}
+        return await self._request(url=self._get_api_url("quote"), params=params)
 
+    async def _request(self, url: str, params: dict):
         try:
-            if not self.account.proxy:
-                connector = None
-            else:
-                connector = self.account.get_proxy_connector()
-            max_attempts = 10
-
-            for attempt in range(max_attempts):
-                async with aiohttp.ClientSession(connector=connector) as session:
-                    async with session.get(url, headers=headers) as response:
-                        if response.status == 200:
-                            result = await response.json()
-                            return result
-                        logger.info(f'Attempt to get a response {attempt + 1}/{max_attempts}')
-                        await asyncio.sleep(1)
-            logger.error("Couldn't get a response")
-            return False
+            return await zerox_retry.run(self._get, url=url, params=params)
         except Exception as ex:
             logger.error(f"[{self.name}] Failed to fetch quote: {ex}")
             return False
 
+    async def _get(self, url: str, params: dict) -> dict:
+        headers = {'0x-api-key': ZEROX_API_KEY}
+        request_kwargs = {"proxy": f"http://{self.account.proxy}"} if self.account.proxy else {}
+
+        await rate_limiter.acquire(url=url, proxy=self.account.proxy)
+
+        async with proxy_rotator.track(proxy=self.account.proxy):
+            session = provider_pool.get_session(proxy=self.account.proxy)
+
+            async with session.get(url, params=params, headers=headers, **request_kwargs) as response:
+                # 429 and 5xx are retried by zerox_retry (honouring Retry-After), other statuses fail right away
+                response.raise_for_status()
+                return await response.json()
+
     @wait(delay_range=TX_DELAY_RANGE)
     async def swap(self, from_token: Token, to_token: Token, amount: float = None):
         try:
@@ -88,15 +101,16 @@ class ZeroX:
             if not await self.account.approve(spender=spender, token=from_token, value=from_token.to_wei(value=value)):
                 return False
 
-            tx = await self.account.send_transaction(
-                to=Web3.to_checksum_address(json_data["to"]),
-                data=json_data["data"],
-                value=int(json_data["value"])
-            )
+            async with self.account.tx_slot():
+                tx = await self.account.send_transaction(
+                    to=Web3.to_checksum_address(json_data["to"]),
+                    data=json_data["data"],
+                    value=int(json_data["value"])
+                )
 
-            if tx:
-                if await self.account.verify_tx(tx_hash=tx):
-                    return True
+                if tx:
+                    if await self.account.verify_tx(tx_hash=tx):
+                        return True
             return False
 
         except Exception as ex:
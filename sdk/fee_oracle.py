@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import defaultdict
+from typing import Dict, Tuple
+
+from web3 import AsyncWeb3
+
+from sdk.constants import (
+    FEE_ORACLE_FEE_HISTORY,
+    FEE_ORACLE_MAX_PRIORITY_FEE,
+    FEE_ORACLE_TTL,
+    FEE_HISTORY_BLOCK_COUNT,
+    FEE_HISTORY_REWARD_PERCENTILE
+)
+from sdk.logger import logger
+from sdk.models.chain import Chain
+
+
+class FeeOracle:
+    """EIP-1559 fee estimates shared by every client, cached per chain for FEE_ORACLE_TTL seconds."""
+
+    def __init__(self) -> None:
+        self._cache: Dict[str, Tuple[float, int, int]] = {}
+        self._locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+    async def get_fees(self, w3: AsyncWeb3, chain: Chain) -> Tuple[int, int]:
+        """Returns (base_fee_per_gas, max_priority_fee_per_gas) for the next block."""
+        fees = self._get_cached(chain=chain)
+        if fees:
+            return fees
+
+        async with self._locks[chain.name]:
+            fees = self._get_cached(chain=chain)
+            if fees:
+                return fees
+
+            fees = await self._fetch_fees(w3=w3, chain=chain)
+            self._cache[chain.name] = (time.monotonic(), *fees)
+            return fees
+
+    def _get_cached(self, chain: Chain) -> Tuple[int, int] | None:
+        cached = self._cache.get(chain.name)
+
+        if cached and time.monotonic() - cached[0] < FEE_ORACLE_TTL:
+            return cached[1], cached[2]
+
+        return None
+
+    async def _fetch_fees(self, w3: AsyncWeb3, chain: Chain) -> Tuple[int, int]:
+        if (chain.fee_oracle or FEE_ORACLE_FEE_HISTORY) == FEE_ORACLE_FEE_HISTORY:
+            try:
+                return await self._fetch_fee_history(w3=w3)
+            except Exception as e:
+                logger.warning(
+                    f"[FeeOracle] eth_feeHistory failed on {chain.name}, using eth_maxPriorityFeePerGas: {e}",
+                    send_to_tg=False
+                )
+        elif chain.fee_oracle != FEE_ORACLE_MAX_PRIORITY_FEE:
+            logger.warning(f"[FeeOracle] Unknown fee oracle for {chain.name}: {chain.fee_oracle}", send_to_tg=False)
+
+        return await self._fetch_max_priority_fee(w3=w3)
+
+    @staticmethod
+    async def _fetch_fee_history(w3: AsyncWeb3) -> Tuple[int, int]:
+        fee_history = await w3.eth.fee_history(
+            FEE_HISTORY_BLOCK_COUNT,
+            "latest",
+            [FEE_HISTORY_REWARD_PERCENTILE]
+        )
+
+        # the last base fee is the one predicted for the pending block
+        base_fee = fee_history["baseFeePerGas"][-1]
+        rewards = sorted(reward[0] for reward in fee_history.get("reward", []) if reward and reward[0] > 0)
+
+        if not rewards:
+            return base_fee, await w3.eth.max_priority_fee
+
+        return base_fee, rewards[len(rewards) // 2]
+
+    @staticmethod
+    async def _fetch_max_priority_fee(w3: AsyncWeb3) -> Tuple[int, int]:
+        last_block = await w3.eth.get_block("latest")
+        return last_block["baseFeePerGas"], await w3.eth.max_priority_fee
+
+
+fee_oracle = FeeOracle()
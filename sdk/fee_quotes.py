@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Hashable, Set, Tuple
+
+from config import LZ_FEE_QUOTE_TTL, MAX_BRIDGE_FEE
+from sdk.constants import LZ_FEE_QUOTE_MAX_BLOCKS, LZ_FEE_QUOTE_BLOCK_NUMBER_TTL
+from sdk.models.chain import Chain
+from sdk.providers import provider_pool
+from sdk.watchers import watcher_pool
+
+# (action, dapp name), e.g. ("BSC-Celo", "Merkly"), same as DataItem's remaining actions
+Route = Tuple[str, str]
+
+
+@dataclass
+class FeeQuote:
+    fee: int
+    fetched_at: float
+    block_number: int | None
+
+
+class FeeQuoteCache:
+    """
+    LayerZero fee quotes shared by all wallets. A quote is refreshed after LZ_FEE_QUOTE_TTL seconds,
+    or earlier once the source chain has produced LZ_FEE_QUOTE_MAX_BLOCKS new blocks.
+    Fresh quotes are served without locking, concurrent refreshes of the same quote share one eth_call.
+    Routes quoted above MAX_BRIDGE_FEE are skipped until their quote expires.
+    """
+
+    def __init__(self) -> None:
+        self.quotes: Dict[Hashable, FeeQuote] = {}
+        self.skipped_routes: Dict[Route, float] = {}
+        self._locks: Dict[Hashable, asyncio.Lock] = defaultdict(asyncio.Lock)
+        # chain name -> (timestamp, block number) read from the node
+        self._block_numbers: Dict[str, Tuple[float, int]] = {}
+
+    async def get_fee(self, key: Hashable, chain: Chain, fetch: Callable[[], Awaitable[int]]) -> int:
+        quote = self.quotes.get(key)
+
+        if quote is not None and await self._is_fresh(quote=quote, chain=chain):
+            return quote.fee
+
+        async with self._locks[key]:
+            # another wallet may have refreshed the quote while this one waited for the lock
+            quote = self.quotes.get(key)
+
+            if quote is None or not await self._is_fresh(quote=quote, chain=chain):
+                block_number = await self._get_block_number(chain=chain)
+                quote = FeeQuote(fee=await fetch(), fetched_at=time.monotonic(), block_number=block_number)
+                self.quotes[key] = quote
+
+            return quote.fee
+
+    async def _get_block_number(self, chain: Chain) -> int | None:
+        # the block watcher only runs while receipts or funds are awaited, otherwise the node is asked
+        block_number = watcher_pool.get_block_watcher(chain=chain).last_block_number
+
+        if block_number is not None:
+            return block_number
+
+        cached = self._block_numbers.get(chain.name)
+
+        if cached and time.monotonic() - cached[0] < LZ_FEE_QUOTE_BLOCK_NUMBER_TTL:
+            return cached[1]
+
+        try:
+            block_number = await provider_pool.get_web3(chain=chain).eth.block_number
+        except Exception:
+            return None
+
+        self._block_numbers[chain.name] = (time.monotonic(), block_number)
+        return block_number
+
+    async def _is_fresh(self, quote: FeeQuote, chain: Chain) -> bool:
+        if time.monotonic() - quote.fetched_at > LZ_FEE_QUOTE_TTL:
+            return False
+
+        if quote.block_number is None:
+            return True
+
+        block_number = await self._get_block_number(chain=chain)
+        return block_number is None or block_number - quote.block_number < LZ_FEE_QUOTE_MAX_BLOCKS
+
+    def check_max_fee(self, route: Route, chain: Chain, fee: int) -> None:
+        """Raises BridgeFeeTooHighError and skips the route for LZ_FEE_QUOTE_TTL seconds if fee is above the max."""
+        max_fee = MAX_BRIDGE_FEE.get(chain.name)
+
+        if not max_fee or fee <= max_fee * 10 ** 18:
+            self.skipped_routes.pop(route, None)
+            return
+
+        self.skipped_routes[route] = time.monotonic() + LZ_FEE_QUOTE_TTL
+
+        raise BridgeFeeTooHighError(
+            f"{route[1]} {route[0]} fee {fee / 10 ** 18} {chain.coin_symbol} is above MAX_BRIDGE_FEE, skipping"
+        )
+
+    def get_skipped_routes(self) -> Set[Route]:
+        now = time.monotonic()
+        return {route for route, skipped_until in self.skipped_routes.items() if skipped_until > now}
+
+
+class BridgeFeeTooHighError(Exception):
+    def __init__(self, message: str = "Bridge fee is above MAX_BRIDGE_FEE", *args: object) -> None:
+        self.message = message
+        super().__init__(self.message, *args)
+
+
+lz_fee_quotes = FeeQuoteCache()
@@ -1,10 +1,27 @@
+import atexit
+import threading
+import time
 from enum import Enum
+from typing import Dict, List
 
-import telebot
 from loguru import logger as loguru_logger
 
 from config import TG_TOKEN, TG_IDS, USE_TG_BOT
 
+# buffered telegram logs are sent as one message every TG_FLUSH_INTERVAL seconds
+TG_FLUSH_INTERVAL = 3
+
+# min seconds between two messages to the same chat
+TG_SEND_INTERVAL = 1
+
+# older messages are dropped when more than this many are waiting
+TG_MAX_BUFFERED_MESSAGES = 100
+
+TG_MESSAGE_MAX_LENGTH = 4096
+
+# max seconds to wait for the remaining messages on shutdown
+TG_SHUTDOWN_TIMEOUT = 10
+
 
 class Icons(Enum):
     SUCCESS = "🟢"
@@ -14,6 +31,110 @@ class Icons(Enum):
     DEBUG = "🟣"
 
 
+class TelegramSender:
+    """
+    Sends telegram logs from a background thread, so logging never blocks the event loop.
+    Messages are buffered and sent to every recipient as one message every TG_FLUSH_INTERVAL seconds;
+    repeated messages are merged and the oldest ones are dropped on overflow.
+    """
+
+    def __init__(self, token: str, chat_ids: List[int]) -> None:
+        self.token = token
+        self.chat_ids = chat_ids
+        self._buffer: List[List] = []
+        self._dropped = 0
+        self._next_send_at: Dict[int, float] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def send(self, text: str) -> None:
+        with self._lock:
+            if self._buffer and self._buffer[-1][0] == text:
+                self._buffer[-1][1] += 1
+            else:
+                if len(self._buffer) >= TG_MAX_BUFFERED_MESSAGES:
+                    self._buffer.pop(0)
+                    self._dropped += 1
+
+                self._buffer.append([text, 1])
+
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="telegram-sender", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+
+    def close(self) -> None:
+        """Sends what is left in the buffer and stops the sender thread."""
+        if self._thread is None:
+            return
+
+        self._stop_event.set()
+        self._thread.join(timeout=TG_SHUTDOWN_TIMEOUT)
+        self._thread = None
+        self._stop_event.clear()
+
+    def _run(self) -> None:
+        import telebot
+
+        bot = telebot.TeleBot(self.token, disable_web_page_preview=True)
+
+        while not self._stop_event.wait(TG_FLUSH_INTERVAL):
+            self._flush(bot=bot)
+
+        self._flush(bot=bot)
+
+    def _flush(self, bot) -> None:
+        for text in self._take_messages():
+            for chat_id in self.chat_ids:
+                self._send_message(bot=bot, chat_id=chat_id, text=text)
+
+    def _take_messages(self) -> List[str]:
+        with self._lock:
+            lines = [text if count == 1 else f"{text} (x{count})" for text, count in self._buffer]
+            dropped = self._dropped
+            self._buffer.clear()
+            self._dropped = 0
+
+        if dropped:
+            lines.insert(0, f"... {dropped} messages skipped")
+
+        messages = []
+        for line in lines:
+            line = line[:TG_MESSAGE_MAX_LENGTH]
+
+            if messages and len(messages[-1]) + len(line) + 1 <= TG_MESSAGE_MAX_LENGTH:
+                messages[-1] += f"\n{line}"
+            else:
+                messages.append(line)
+
+        return messages
+
+    def _send_message(self, bot, chat_id: int, text: str) -> None:
+        delay = self._next_send_at.get(chat_id, 0) - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+        for _ in range(2):
+            try:
+                bot.send_message(chat_id, text)
+                break
+            except Exception as e:
+                # telegram answers 429 with the number of seconds to wait
+                retry_after = (getattr(e, "result_json", None) or {}).get("parameters", {}).get("retry_after")
+
+                if not retry_after:
+                    loguru_logger.error(f"Encountered an error when sending telegram message: {e}")
+                    break
+
+                time.sleep(retry_after)
+
+        self._next_send_at[chat_id] = time.monotonic() + TG_SEND_INTERVAL
+
+
+telegram_sender = TelegramSender(token=TG_TOKEN, chat_ids=TG_IDS)
+
+
 class CustomLogger:
     def __init__(self, telegram_logger):
         self.telegram_logger = telegram_logger
@@ -48,18 +169,13 @@ class CustomLogger:
         self.loguru_logger.exception(message)
 
     @staticmethod
-    def send_message_telegram(bot, text: str):
-        try:
-            if USE_TG_BOT:
-                for tg_id in TG_IDS:
-                    bot.send_message(tg_id, text)
-        except Exception as e:
-            raise Exception(f"Encountered an error when sending telegram message: {e}")
+    def tg_logger(text: str) -> None:
+        if USE_TG_BOT:
+            telegram_sender.send(text)
 
     @staticmethod
-    def tg_logger(text):
-        bot = telebot.TeleBot(TG_TOKEN, disable_web_page_preview=True) if USE_TG_BOT else None
-        CustomLogger.send_message_telegram(bot, text)
+    def close() -> None:
+        telegram_sender.close()
 
 
 logger = CustomLogger(telegram_logger=CustomLogger.tg_logger)
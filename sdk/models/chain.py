@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from enum import unique, Enum
+from typing import List
 
 from config import (
     MAINNET_RPC_URL,
@@ -20,7 +21,9 @@ from config import (
     CONFLUX_RPC_URL,
     ZORA_RPC_URL,
     ARBITRUM_RPC_URL,
+    WS_RPC_URLS,
 )
+from sdk.constants import MULTICALL3_CONTRACT_ADDRESS
 
 
 @dataclass
@@ -30,21 +33,35 @@ class Chain:
     coin_symbol: str | None = None
     explorer: str | None = None
     eip_1559: bool | None = None
-    rpc: str | None = None
+    fee_oracle: str | None = None
+    rpc: str | List[str] | None = None
+    ws_rpc: str | None = None
     binance_chain_name: str | None = None
     okx_chain_name: str | None = None
     okx_withdrawal_fee: int | None = None
     orbiter_chain_id: int | None = None
     orbiter_dst_chain_code: int | None = None
     lz_chain_id: int | None = None
+    multicall_address: str | None = None
 
     def __str__(self) -> str:
         return self.name
 
+    @property
+    def rpcs(self) -> List[str]:
+        if not self.rpc:
+            return []
+
+        if isinstance(self.rpc, str):
+            return [self.rpc]
+
+        return [rpc for rpc in self.rpc if rpc]
+
 
 EthMainnet = Chain(
     name="ERC20",
     rpc=MAINNET_RPC_URL,
+    ws_rpc=WS_RPC_URLS.get("ERC20"),
     chain_id=1,
     orbiter_chain_id=1,
     orbiter_dst_chain_code=9001,
@@ -53,52 +70,62 @@ EthMainnet = Chain(
     explorer="https://etherscan.io/",
     okx_chain_name="ERC20",
     okx_withdrawal_fee=0.0016,
-    eip_1559=False
+    eip_1559=False,
+    multicall_address=MULTICALL3_CONTRACT_ADDRESS
 )
 
 BSC = Chain(
     name="BSC",
     rpc=BSC_RPC_URL,
+    ws_rpc=WS_RPC_URLS.get("BSC"),
     chain_id=56,
     coin_symbol="BNB",
     explorer="https://bscscan.com/",
     lz_chain_id=102,
-    eip_1559=False
+    eip_1559=False,
+    multicall_address=MULTICALL3_CONTRACT_ADDRESS
 )
 
 Polygon = Chain(
     name="Polygon",
     rpc=POLYGON_RPC_URL,
+    ws_rpc=WS_RPC_URLS.get("Polygon"),
     chain_id=137,
     coin_symbol="MATIC",
     explorer="https://polygonscan.com/",
     lz_chain_id=109,
-    eip_1559=False
+    eip_1559=False,
+    multicall_address=MULTICALL3_CONTRACT_ADDRESS
 )
 
 Moonbeam = Chain(
     name="Moonbeam",
     rpc=MOONBEAM_RPC_URL,
+    ws_rpc=WS_RPC_URLS.get("Moonbeam"),
     chain_id=1284,
     coin_symbol="GLMR",
     explorer="https://moonscan.io/",
     lz_chain_id=126,
-    eip_1559=False
+    eip_1559=False,
+    multicall_address=MULTICALL3_CONTRACT_ADDRESS
 )
 
 Arbitrum = Chain(
     name="Arbitrum",
     rpc=ARBITRUM_RPC_URL,
+    ws_rpc=WS_RPC_URLS.get("Arbitrum"),
     chain_id=42161,
     coin_symbol="ETH",
     explorer="https://arbiscan.io/",
     lz_chain_id=110,
-    eip_1559=False
+    eip_1559=False,
+    multicall_address=MULTICALL3_CONTRACT_ADDRESS
 )
 
 DFK = Chain(
     name="DFK",
     rpc=DFK_RPC_URL,
+    ws_rpc=WS_RPC_URLS.get("DFK"),
     chain_id=53935,
     coin_symbol="JEWEL",
     explorer="https://subnets.avax.network/defi-kingdoms/",
@@ -109,111 +136,133 @@ DFK = Chain(
 Harmony = Chain(
     name="Harmony ONE",
     rpc=HARMONY_RPC_URL,
+    ws_rpc=WS_RPC_URLS.get("Harmony ONE"),
     chain_id=1666600000,
     coin_symbol="ONE",
     explorer="https://explorer.harmony.one/",
     lz_chain_id=116,
-    eip_1559=False
+    eip_1559=False,
+    multicall_address=MULTICALL3_CONTRACT_ADDRESS
 )
 
 Celo = Chain(
     name="Celo",
     rpc=CELO_RPC_URL,
+    ws_rpc=WS_RPC_URLS.get("Celo"),
     chain_id=42220,
     coin_symbol="CELO",
     explorer="https://celoscan.io/",
     lz_chain_id=125,
-    eip_1559=False
+    eip_1559=False,
+    multicall_address=MULTICALL3_CONTRACT_ADDRESS
 )
 
 Moonriver = Chain(
     name="Moonriver",
     rpc=MOONRIVER_RPC_URL,
+    ws_rpc=WS_RPC_URLS.get("Moonriver"),
     chain_id=1285,
     coin_symbol="MOVR",
     explorer="https://moonriver.moonscan.io/",
     lz_chain_id=167,
-    eip_1559=False
+    eip_1559=False,
+    multicall_address=MULTICALL3_CONTRACT_ADDRESS
 )
 
 Kava = Chain(
     name="Kava",
     rpc=KAVA_RPC_URL,
+    ws_rpc=WS_RPC_URLS.get("Kava"),
     chain_id=2222,
     coin_symbol="KAVA",
     lz_chain_id=177,
     explorer="https://kavascan.com/",
-    eip_1559=False
+    eip_1559=False,
+    multicall_address=MULTICALL3_CONTRACT_ADDRESS
 )
 
 Gnosis = Chain(
     name="Gnosis",
     rpc=GNOSIS_RPC_URL,
+    ws_rpc=WS_RPC_URLS.get("Gnosis"),
     chain_id=100,
     coin_symbol="XDAI",
     explorer="https://gnosisscan.io/",
     lz_chain_id=145,
-    eip_1559=False
+    eip_1559=False,
+    multicall_address=MULTICALL3_CONTRACT_ADDRESS
 )
 
 CoreDAO = Chain(
     name="Core",
     rpc=CORE_RPC_URL,
+    ws_rpc=WS_RPC_URLS.get("Core"),
     chain_id=1116,
     coin_symbol="CORE",
     explorer="https://scan.coredao.org/",
     lz_chain_id=153,
-    eip_1559=False
+    eip_1559=False,
+    multicall_address=MULTICALL3_CONTRACT_ADDRESS
 )
 
 Linea = Chain(
     name="Linea",
     rpc=LINEA_RPC_URL,
+    ws_rpc=WS_RPC_URLS.get("Linea"),
     chain_id=59144,
     coin_symbol="ETH",
     explorer="https://lineascan.build/",
     lz_chain_id=183,
-    eip_1559=False
+    eip_1559=False,
+    multicall_address=MULTICALL3_CONTRACT_ADDRESS
 )
 
 Base = Chain(
     name="Base",
     rpc=BSC_RPC_URL,
+    ws_rpc=WS_RPC_URLS.get("Base"),
     chain_id=8453,
     coin_symbol="ETH",
     explorer="https://basescan.org/",
     lz_chain_id=184,
-    eip_1559=False
+    eip_1559=False,
+    multicall_address=MULTICALL3_CONTRACT_ADDRESS
 )
 
 Scroll = Chain(
     name="Scroll",
     rpc=SCROLL_RPC_URL,
+    ws_rpc=WS_RPC_URLS.get("Scroll"),
     chain_id=534352,
     coin_symbol="ETH",
     explorer="https://scrollscan.com/",
     lz_chain_id=214,
-    eip_1559=False
+    eip_1559=False,
+    multicall_address=MULTICALL3_CONTRACT_ADDRESS
 )
 
 Zora = Chain(
     name="Zora",
     rpc=ZORA_RPC_URL,
+    ws_rpc=WS_RPC_URLS.get("Zora"),
     chain_id=7777777,
     coin_symbol="ETH",
     explorer="https://explorer.zora.energy/",
     lz_chain_id=195,
-    eip_1559=False
+    eip_1559=False,
+    multicall_address=MULTICALL3_CONTRACT_ADDRESS
 )
 
 Conflux = Chain(
     name="Conflux",
     rpc=CONFLUX_RPC_URL,
+    ws_rpc=WS_RPC_URLS.get("Conflux"),
     chain_id=1030,
     coin_symbol="CFX",
     lz_chain_id=212,
     explorer="https://www.confluxscan.io/",
-    eip_1559=False
+    eip_1559=False,
+    multicall_address=MULTICALL3_CONTRACT_ADDRESS
 )
 
 NAMES_TO_CHAINS = {
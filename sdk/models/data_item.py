@@ -1,11 +1,13 @@
 from __future__ import annotations
 
 import random
-from dataclasses import dataclass
+from dataclasses import dataclass, field, fields
+from typing import Collection, Dict, List, Set, Tuple
 
+from config import USE_OKX_WITHDRAW, WARMUP_WEIGHTED_ACTIONS
 from sdk.dapps import Stargate, CoreBridge
 from sdk.dapps.merkly import Merkly
-from sdk.models.chain import Chain
+from sdk.models.chain import NAMES_TO_CHAINS
 
 
 @dataclass
@@ -17,7 +19,10 @@ class DataItem:
     merkly_tx_count: dict[str, dict[str, int]]
     stargate_tx_count: int
     core_bridge_tx_count: int
-    chain_with_funds: Chain | None = None,
+    # source chain with the most funds and balance snapshot per chain ({"BSC": {"BNB": 0.1, "USDT": 5.0}}),
+    # both filled by the funds locator
+    chain_with_funds: str | None = None
+    balances: Dict[str, Dict[str, float]] = field(default_factory=dict)
     warmup_started: bool = False
     warmup_finished: bool = False
     okx_withdrawn: bool = False
@@ -27,28 +32,81 @@ class DataItem:
     polygon_to_usdc_swapped: bool = False
     sent_to_okx: bool = False
 
-    def get_random_warmup_action(self):
-        dapps_and_actions = []
+    # remaining (action, dapp) pairs, kept in sync with the counters above by decrease_action_count
+    _actions: List[Tuple[str, type]] = field(default_factory=list, init=False, repr=False, compare=False)
+    _action_positions: Dict[Tuple[str, str], int] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _action_counts: Dict[Tuple[str, str], int] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _max_action_count: int = field(default=0, init=False, repr=False, compare=False)
+    _tx_count: int = field(default=0, init=False, repr=False, compare=False)
 
-        if self.stargate_tx_count > 0:
-            dapps_and_actions.append((
-                "Polygon-Kava", Stargate
-            ))
+    def __post_init__(self) -> None:
+        self._build_action_pool()
 
-        if self.core_bridge_tx_count > 0:
-            dapps_and_actions.append((
-                "BSC-Core", CoreBridge
-            ))
+    def to_dict(self) -> dict:
+        return {item_field.name: getattr(self, item_field.name) for item_field in fields(self) if item_field.init}
+
+    def _build_action_pool(self) -> None:
+        self._actions.clear()
+        self._action_positions.clear()
+        self._action_counts.clear()
+
+        self._add_action(action="Polygon-Kava", dapp=Stargate, count=self.stargate_tx_count)
+        self._add_action(action="BSC-Core", dapp=CoreBridge, count=self.core_bridge_tx_count)
 
         for key, value in self.merkly_tx_count.items():
             for chain, count in value.items():
-                if count > 0:
-                    dapps_and_actions.append((f"{key}-{chain}", Merkly))
-
-        if not dapps_and_actions:
+                self._add_action(action=f"{key}-{chain}", dapp=Merkly, count=count)
+
+        self._max_action_count = max(self._action_counts.values(), default=0)
+        self._tx_count = sum(self._action_counts.values())
+
+    def _add_action(self, action: str, dapp: type, count: int) -> None:
+        if count > 0:
+            key = (action, dapp.__name__)
+            self._action_positions[key] = len(self._actions)
+            self._action_counts[key] = count
+            self._actions.append((action, dapp))
+
+    def _remove_action(self, key: Tuple[str, str]) -> None:
+        index = self._action_positions.pop(key)
+        del self._action_counts[key]
+        last_action = self._actions.pop()
+
+        if index < len(self._actions):
+            self._actions[index] = last_action
+            self._action_positions[(last_action[0], last_action[1].__name__)] = index
+
+    def get_random_warmup_action(
+            self,
+            weighted: bool = WARMUP_WEIGHTED_ACTIONS,
+            chains: Collection[str] = (),
+            skipped_routes: Collection[Tuple[str, str]] = ()
+    ):
+        """
+        Random remaining action, only from the given source chains if any of them has actions left.
+        Skipped (action, dapp name) routes are never picked.
+        """
+        actions = self._actions
+
+        if skipped_routes:
+            actions = [(action, dapp) for action, dapp in actions if (action, dapp.__name__) not in skipped_routes]
+
+        if chains:
+            funded_actions = [(action, dapp) for action, dapp in actions if action.split('-')[0] in chains]
+            actions = funded_actions or actions
+
+        if not actions:
             return None, None
 
-        return random.choice(dapps_and_actions)
+        if not weighted:
+            return random.choice(actions)
+
+        # rejection sampling: a route is accepted with probability proportional to its remaining count
+        while True:
+            action, dapp = random.choice(actions)
+
+            if random.random() * self._max_action_count < self._action_counts[(action, dapp.__name__)]:
+                return action, dapp
 
     def get_item_state(self):
         state = {
@@ -62,17 +120,53 @@ class DataItem:
         return state
 
     def get_tx_count(self):
-        total_transactions = 0
+        return self._tx_count
+
+    def get_remaining_actions(self) -> List[Tuple[str, type]]:
+        return list(self._actions)
+
+    def get_native_balance(self, chain_name: str) -> float | None:
+        return self.balances.get(chain_name, {}).get(NAMES_TO_CHAINS[chain_name].coin_symbol)
+
+    def set_native_balance(self, chain_name: str, balance: float) -> None:
+        self.balances.setdefault(chain_name, {})[NAMES_TO_CHAINS[chain_name].coin_symbol] = balance
+
+    def drop_native_balance(self, chain_name: str) -> None:
+        """Marks the native balance as unknown, e.g. while funds are on their way."""
+        self.balances.get(chain_name, {}).pop(NAMES_TO_CHAINS[chain_name].coin_symbol, None)
 
-        total_transactions += self.stargate_tx_count + self.core_bridge_tx_count
+    def get_funded_chains(self) -> Set[str]:
+        """Chains from the balance snapshot with more native funds than the OKX withdrawal threshold."""
+        funded_chains = set()
 
-        for key, chains in self.merkly_tx_count.items():
-            for chain, value in chains.items():
-                total_transactions += value
+        for chain_name in self.balances:
+            balance = self.get_native_balance(chain_name=chain_name)
+            min_balance = USE_OKX_WITHDRAW.get(chain_name, {}).get("min-balance", 0)
 
-        return total_transactions
+            if balance is not None and balance > min_balance:
+                funded_chains.add(chain_name)
+
+        return funded_chains
+
+    def get_chain_with_funds(self) -> str | None:
+        return max(self.get_funded_chains(), key=lambda chain_name: self.get_native_balance(chain_name), default=None)
 
     def decrease_action_count(self, action: str, dapp: str, amount: int = 1) -> bool:
+        if not self._decrease_stored_action_count(action=action, dapp=dapp, amount=amount):
+            return False
+
+        key = (action, dapp)
+        self._tx_count -= amount
+
+        if key in self._action_counts:
+            self._action_counts[key] -= amount
+
+            if self._action_counts[key] <= 0:
+                self._remove_action(key)
+
+        return True
+
+    def _decrease_stored_action_count(self, action: str, dapp: str, amount: int = 1) -> bool:
         if action == "Polygon-Kava" and dapp == "Stargate":
             attribute_name = f"stargate_tx_count"
         elif action == "BSC-Core" and dapp == "CoreBridge":
@@ -80,7 +174,7 @@ class DataItem:
         else:
             chains = action.split('-')
             if self.merkly_tx_count[chains[0]][chains[1]] >= amount:
-                self.merkly_tx_count[chains[0]][chains[1]] -= 1
+                self.merkly_tx_count[chains[0]][chains[1]] -= amount
                 return True
             else:
                 return False
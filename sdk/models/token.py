@@ -7,12 +7,13 @@ from sdk.constants import (
     NATIVE_TOKEN_CONTRACT_ADDRESS,
     POLYGON_USDC_CONTRACT_ADDRESS,
     GNOSIS_USDC_CONTRACT_ADDRESS,
-    USDC_CONTRACT_ABI,
-    L2_ETH_TOKEN_ABI,
-    FIAT_TOKEN_ABI,
+    USDC_CONTRACT_ABI_FILE,
+    L2_ETH_TOKEN_ABI_FILE,
+    FIAT_TOKEN_ABI_FILE,
     BSC_USDT_CONTRACT_ADDRESS,
     STG_TOKEN_CONTRACT_ADDRESS,
-    STG_TOKEN_ABI
+    STG_TOKEN_ABI_FILE,
+    load_abi
 )
 
 
@@ -22,7 +23,7 @@ class Token:
     decimals: int
     symbol: str
     is_native_token_mapping: Dict[str, bool] | None = None
-    abi: dict | None = None
+    abi_file: str | None = None
     is_stable_coin: bool = False
     coingecko_id: str | None = None
     round_decimal_places: int | None = None
@@ -33,6 +34,10 @@ class Token:
     def __repr__(self) -> str:
         return self.symbol
 
+    @property
+    def abi(self) -> list | None:
+        return load_abi(self.abi_file) if self.abi_file else None
+
     def __hash__(self):
         return hash(self.chain_to_contract_mapping["ZKERA"])
 
@@ -65,7 +70,7 @@ USDC_Token = Token(
         "Cel": "",
         "Gnosis": GNOSIS_USDC_CONTRACT_ADDRESS,
     },
-    abi=USDC_CONTRACT_ABI,
+    abi_file=USDC_CONTRACT_ABI_FILE,
     decimals=6,
     symbol="USDC",
     is_stable_coin=True,
@@ -87,7 +92,7 @@ USDT_Token = Token(
         "BSC": BSC_USDT_CONTRACT_ADDRESS,
     },
     is_native_token_mapping={"BSC": False},
-    abi=FIAT_TOKEN_ABI,
+    abi_file=FIAT_TOKEN_ABI_FILE,
     decimals=6,
     symbol="USDT",
     round_decimal_places=2,
@@ -99,7 +104,7 @@ ETH_Token = Token(
     chain_to_contract_mapping={
         "ZKERA": NATIVE_TOKEN_CONTRACT_ADDRESS,
     },
-    abi=L2_ETH_TOKEN_ABI,
+    abi_file=L2_ETH_TOKEN_ABI_FILE,
     decimals=18,
     symbol="ETH",
     round_decimal_places=6,
@@ -112,7 +117,7 @@ STG_Token = Token(
         "Polygon": STG_TOKEN_CONTRACT_ADDRESS
     },
     is_native_token_mapping={"Polygon": False},
-    abi=STG_TOKEN_ABI,
+    abi_file=STG_TOKEN_ABI_FILE,
     decimals=18,
     symbol="STG"
 )
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Dict, List, Tuple
+
+from eth_abi import encode
+from web3 import AsyncWeb3, Web3
+
+from sdk.constants import MULTICALL3_ABI, BALANCES_BATCH_SIZE
+from sdk.contracts import contract_cache
+from sdk.logger import logger
+from sdk.models.chain import Chain
+from sdk.providers import provider_pool
+
+GET_ETH_BALANCE_SELECTOR = Web3.keccak(text="getEthBalance(address)")[:4]
+BALANCE_OF_SELECTOR = Web3.keccak(text="balanceOf(address)")[:4]
+
+
+class Multicall:
+    """
+    Batch balance reads: one Multicall3 aggregate3 call (or one JSON-RPC batch request
+    on chains without Multicall3) per BALANCES_BATCH_SIZE addresses.
+    Balances that could not be read are returned as None.
+    """
+
+    @staticmethod
+    async def get_native_balances(
+            chain: Chain, addresses: List[str], proxy: str | None = None
+    ) -> Dict[str, int | None]:
+        if not chain.rpcs:
+            logger.error(f"[Multicall] No RPC endpoint specified for {chain.name}", send_to_tg=False)
+            return dict.fromkeys(addresses)
+
+        w3 = provider_pool.get_web3(chain=chain, proxy=proxy)
+
+        if chain.multicall_address:
+            calls = [
+                (chain.multicall_address, GET_ETH_BALANCE_SELECTOR + encode(["address"], [address]))
+                for address in addresses
+            ]
+            return await Multicall._aggregate_balances(w3=w3, chain=chain, addresses=addresses, calls=calls)
+
+        requests = [("eth_getBalance", [address, "latest"]) for address in addresses]
+        return await Multicall._batch_balances(w3=w3, chain=chain, addresses=addresses, requests=requests)
+
+    @staticmethod
+    async def get_token_balances(
+            chain: Chain, token_address: str, addresses: List[str], proxy: str | None = None
+    ) -> Dict[str, int | None]:
+        if not chain.rpcs:
+            logger.error(f"[Multicall] No RPC endpoint specified for {chain.name}", send_to_tg=False)
+            return dict.fromkeys(addresses)
+
+        w3 = provider_pool.get_web3(chain=chain, proxy=proxy)
+        token_address = Web3.to_checksum_address(token_address)
+        calldata = [BALANCE_OF_SELECTOR + encode(["address"], [address]) for address in addresses]
+
+        if chain.multicall_address:
+            calls = [(token_address, data) for data in calldata]
+            return await Multicall._aggregate_balances(w3=w3, chain=chain, addresses=addresses, calls=calls)
+
+        requests = [("eth_call", [{"to": token_address, "data": Web3.to_hex(data)}, "latest"]) for data in calldata]
+        return await Multicall._batch_balances(w3=w3, chain=chain, addresses=addresses, requests=requests)
+
+    @staticmethod
+    async def _aggregate_balances(
+            w3: AsyncWeb3, chain: Chain, addresses: List[str], calls: List[Tuple[str, bytes]]
+    ) -> Dict[str, int | None]:
+        multicall = contract_cache.get_contract(w3=w3, address=chain.multicall_address, abi=MULTICALL3_ABI)
+
+        async def aggregate(chunk: List[Tuple[str, bytes]]) -> List[int | None]:
+            try:
+                results = await multicall.functions.aggregate3(
+                    [(target, True, data) for target, data in chunk]
+                ).call()
+            except Exception as e:
+                logger.error(f"[Multicall] aggregate3 failed on {chain.name}: {e}", send_to_tg=False)
+                return [None] * len(chunk)
+
+            return [
+                int.from_bytes(return_data[:32], "big") if success and len(return_data) >= 32 else None
+                for success, return_data in results
+            ]
+
+        chunks = await asyncio.gather(*[
+            aggregate(calls[i:i + BALANCES_BATCH_SIZE]) for i in range(0, len(calls), BALANCES_BATCH_SIZE)
+        ])
+
+        return dict(zip(addresses, [balance for chunk in chunks for balance in chunk]))
+
+    @staticmethod
+    async def _batch_balances(
+            w3: AsyncWeb3, chain: Chain, addresses: List[str], requests: List[Tuple[str, list]]
+    ) -> Dict[str, int | None]:
+        async def batch(chunk: List[Tuple[str, list]]) -> List[int | None]:
+            try:
+                responses = await w3.provider.make_batch_request(chunk)
+            except Exception as e:
+                logger.error(f"[Multicall] JSON-RPC batch failed on {chain.name}: {e}", send_to_tg=False)
+                return [None] * len(chunk)
+
+            return [
+                int(response["result"], 16) if response.get("result") not in (None, "0x") else None
+                for response in responses
+            ]
+
+        chunks = await asyncio.gather(*[
+            batch(requests[i:i + BALANCES_BATCH_SIZE]) for i in range(0, len(requests), BALANCES_BATCH_SIZE)
+        ])
+
+        return dict(zip(addresses, [balance for chunk in chunks for balance in chunk]))
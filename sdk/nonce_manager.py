@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import asyncio
+from collections import defaultdict
+from typing import Dict, Tuple
+
+from web3 import AsyncWeb3
+
+from sdk.constants import NONCE_ERROR_MESSAGES, TX_ALREADY_KNOWN_MESSAGES
+from sdk.models.chain import Chain
+
+
+class NonceManager:
+    """
+    Hands out nonces per (address, chain) from a local counter, so back-to-back transactions
+    don't wait on eth_getTransactionCount. The counter is synced from the pending nonce on first
+    use and again whenever a send fails with a nonce / replacement error, a send fails without telling
+    whether the transaction went out, or a receipt wait times out.
+    """
+
+    def __init__(self) -> None:
+        self._chain_ids: Dict[str, int] = {}
+        self._nonces: Dict[Tuple[str, str], int] = {}
+        self._locks: Dict[Tuple[str, str], asyncio.Lock] = defaultdict(asyncio.Lock)
+
+    async def get_chain_id(self, w3: AsyncWeb3, chain: Chain) -> int:
+        if chain.name not in self._chain_ids:
+            self._chain_ids[chain.name] = await w3.eth.chain_id
+
+        return self._chain_ids[chain.name]
+
+    async def reserve_nonce(self, w3: AsyncWeb3, address: str, chain: Chain) -> int:
+        key = (address, chain.name)
+
+        async with self._locks[key]:
+            if key not in self._nonces:
+                self._nonces[key] = await w3.eth.get_transaction_count(address, "pending")
+
+            nonce = self._nonces[key]
+            self._nonces[key] = nonce + 1
+            return nonce
+
+    def release_nonce(self, address: str, chain: Chain, nonce: int) -> None:
+        """Gives back a nonce whose transaction was never broadcast."""
+        key = (address, chain.name)
+
+        if self._nonces.get(key) == nonce + 1:
+            self._nonces[key] = nonce
+        else:
+            # a later nonce was already handed out, so the gap can only be fixed by a resync
+            self.resync(address=address, chain=chain)
+
+    def resync(self, address: str, chain: Chain) -> None:
+        self._nonces.pop((address, chain.name), None)
+
+    @staticmethod
+    def is_nonce_error(error: Exception) -> bool:
+        message = str(error).lower()
+        return any(error_message in message for error_message in NONCE_ERROR_MESSAGES)
+
+    @staticmethod
+    def is_already_known_error(error: Exception) -> bool:
+        message = str(error).lower()
+        return any(error_message in message for error_message in TX_ALREADY_KNOWN_MESSAGES)
+
+
+nonce_manager = NonceManager()
@@ -1,43 +1,143 @@
 from __future__ import annotations
 
-from typing import Dict
+import asyncio
+from typing import Dict, List
 
-from ccxt.async_support import okx
 from loguru import logger
 
 from sdk import Client
 from sdk.constants import (
+    OKX_API_URL,
     OKX_AFTER_ERROR_SLEEP_TIME,
     OKX_ON_FAIL_RETRY_COUNT,
-    OKX_WAIT_FOR_WITHDRAWAL_FINAL_STATUS_ATTEMPTS,
-    OKX_WAIT_FOR_WITHDRAWAL_FINAL_STATUS_MAX_WAIT_TIME,
-    OKX_WAIT_FOR_WITHDRAWAL_RECEIVED_ATTEMPTS,
-    OKX_WAIT_FOR_WITHDRAWAL_RECIEVED_SLEEP_TIME,
+    OKX_WITHDRAWAL_STATUS_POLL_INTERVAL,
+    OKX_WITHDRAWAL_FINAL_STATUS_TIMEOUT,
+    OKX_WITHDRAWAL_HISTORY_LIMIT,
+    OKX_WITHDRAWAL_SUCCESS_STATES,
+    OKX_WITHDRAWAL_FAILED_STATES,
+    OKX_WITHDRAWAL_RECEIVED_TIMEOUT,
     RETRIES,
     OKX_WITHDRAWAL_CHAIN_TO_DATA
 )
 from sdk.models.chain import Polygon, Chain
 from sdk.models.token import USDC_Token, Token
-from sdk.utils import retry_on_fail, sleep_pause
+from sdk.rate_limiter import rate_limiter
+from sdk.retry import RetryPolicy
+from sdk.utils import sleep_pause
+from sdk.watchers import watcher_pool
+
+
+class WithdrawalTracker:
+    """
+    Final status of every pending withdrawal of one OKX account: a single task requests the withdrawal history
+    once per OKX_WITHDRAWAL_STATUS_POLL_INTERVAL and resolves the waiters whose withdrawals reached a final state.
+    """
+
+    def __init__(self, exchange) -> None:
+        self.exchange = exchange
+        self.pending: Dict[str, asyncio.Future] = {}
+        self._task: asyncio.Task | None = None
+
+    async def wait_for_final_status(
+            self, withdrawal_id: str, timeout: float = OKX_WITHDRAWAL_FINAL_STATUS_TIMEOUT
+    ) -> str:
+        """Final state of the withdrawal, one of OKX_WITHDRAWAL_SUCCESS_STATES or OKX_WITHDRAWAL_FAILED_STATES."""
+        future = self.pending[withdrawal_id] = asyncio.get_running_loop().create_future()
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._poll())
+
+        try:
+            return await asyncio.wait_for(future, timeout=timeout)
+        finally:
+            self.pending.pop(withdrawal_id, None)
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+
+    async def _poll(self) -> None:
+        while self.pending:
+            try:
+                records = await self._get_history()
+                found = {record["wdId"]: record for record in records if record.get("wdId") in self.pending}
+
+                # older withdrawals may not fit into the latest page, those are requested one by one
+                if len(records) >= OKX_WITHDRAWAL_HISTORY_LIMIT:
+                    for withdrawal_id in set(self.pending) - set(found):
+                        found.update({record["wdId"]: record for record in await self._get_history(withdrawal_id)})
+
+                for withdrawal_id, record in found.items():
+                    self._resolve(withdrawal_id=withdrawal_id, state=record["state"])
+
+            except Exception as e:
+                logger.error(f"[OKX] Error while polling withdrawal history: {e}")
+
+            await asyncio.sleep(OKX_WITHDRAWAL_STATUS_POLL_INTERVAL)
+
+    async def _get_history(self, withdrawal_id: str = None) -> List[dict]:
+        params = {"wdId": withdrawal_id} if withdrawal_id else {"limit": OKX_WITHDRAWAL_HISTORY_LIMIT}
+
+        await rate_limiter.acquire(url=OKX_API_URL)
+        response = await self.exchange.private_get_asset_withdrawal_history(params=params)
+
+        return response["data"]
+
+    def _resolve(self, withdrawal_id: str, state: str) -> None:
+        if state not in OKX_WITHDRAWAL_SUCCESS_STATES + OKX_WITHDRAWAL_FAILED_STATES:
+            return
+
+        future = self.pending.pop(withdrawal_id, None)
+        if future is not None and not future.done():
+            future.set_result(state)
+
+
+class OKXSessionPool:
+    """One authenticated ccxt exchange (and its withdrawal tracker) per API key for the whole run."""
+
+    def __init__(self) -> None:
+        self.exchanges: Dict[str, object] = {}
+        self.trackers: Dict[str, WithdrawalTracker] = {}
+
+    def get_exchange(self, api_key: str, secret: str, password: str):
+        if api_key not in self.exchanges:
+            # ccxt is heavy to import, so it is only loaded once a withdrawal is needed
+            from ccxt.async_support import okx
+
+            self.exchanges[api_key] = okx(config={
+                "apiKey": api_key,
+                "secret": secret,
+                "password": password,
+                "enableRateLimit": True
+            })
+            self.trackers[api_key] = WithdrawalTracker(exchange=self.exchanges[api_key])
+
+        return self.exchanges[api_key]
+
+    def get_tracker(self, api_key: str) -> WithdrawalTracker:
+        return self.trackers[api_key]
+
+    async def close(self) -> None:
+        for tracker in self.trackers.values():
+            tracker.stop()
+
+        for exchange in self.exchanges.values():
+            await exchange.close()
+
+        self.exchanges.clear()
+        self.trackers.clear()
+
+
+okx_pool = OKXSessionPool()
 
 
 class OKX:
     def __init__(self, api_key: str, secret: str, password: str, client: Client) -> None:
         self.client = client
-        self._api_key = api_key
-        self._secret = secret
-        self._password = password
-        self.exchange = okx(config=self._get_config())
-
-    def _get_config(self) -> Dict:
-        return {
-            "apiKey": self._api_key,
-            "secret": self._secret,
-            "password": self._password,
-            "enableRateLimit": True
-        }
-
-    @retry_on_fail(tries=RETRIES)
+        self.exchange = okx_pool.get_exchange(api_key=api_key, secret=secret, password=password)
+        self.withdrawal_tracker = okx_pool.get_tracker(api_key=api_key)
+
+    @RetryPolicy(attempts=RETRIES)
     async def withdraw(
             self,
             amount_to_withdraw: float,
@@ -45,102 +145,103 @@ class OKX:
             chain: Chain = Polygon,
             retry_count=0
     ) -> str:
-        async with self.exchange as exchange:
-            try:
-                if type(token) is str:
-                    token_symbol = token
-                    initial_client_balance = await self.client.get_native_balance(chain=chain) / 10 ** 18
-                else:
-                    token_symbol = token.symbol
-                    initial_client_balance = await self.client.get_token_balance(token=token)
-
-                logger.info(f"[OKX] Trying to withdraw {amount_to_withdraw} {token_symbol} to {self.client.address}")
-
-                okx_chain_name = "CELO" if chain.chain_id == 42220 else chain.name
-
-                data = await exchange.withdraw(
-                    token_symbol,
-                    amount_to_withdraw,
-                    self.client.address,
-                    params={
-                        "toAddress": self.client.address,
-                        "chainName": f"{token_symbol}-{okx_chain_name}",
-                        "dest": 4,
-                        "fee": OKX_WITHDRAWAL_CHAIN_TO_DATA[chain.name]["fee"],
-                        "pwd": "-",
-                        "amt": amount_to_withdraw,
-                        "network": okx_chain_name,
-                    },
-                )
-                withdrawal_id = data["info"]["wdId"]
+        try:
+            if type(token) is str:
+                token_symbol = token
+                token_address = None
+            else:
+                token_symbol = token.symbol
+                is_native = (token.is_native_token_mapping or {}).get(chain.name)
+                token_address = None if is_native else token.chain_to_contract_mapping[chain.name]
+
+            # raw balance before the withdrawal, delivery is detected as soon as it rises
+            initial_client_balance = await watcher_pool.get_funds_watcher(chain=chain).get_balance(
+                address=self.client.address, token_address=token_address
+            )
 
-            except Exception as e:
-                error_message = str(e)
-
-                if "Withdrawal address is not allowlisted for verification exemption" in error_message:
-                    logger.error(f"[OKX] Address {self.client.address} is not allowlisted")
-                    return False
-                elif "Insufficient balance" in error_message:
-                    logger.error(f"[OKX] Insufficient funds for withdrawal")
-                    return False
-                else:
-                    logger.error(f"[OKX] Error while withdrawing {amount_to_withdraw} {token_symbol}: {error_message}")
-
-                if retry_count < OKX_ON_FAIL_RETRY_COUNT:
-                    logger.info(f"[OKX] Withdrawal unsuccessful, waiting for another try")
-                    await sleep_pause(delay_range=OKX_AFTER_ERROR_SLEEP_TIME, enable_message=False)
-                    return await self.withdraw(
-                        retry_count=retry_count + 1,
-                        amount_to_withdraw=amount_to_withdraw,
-                        token=token,
-                        chain=chain
-                    )
-                else:
-                    logger.error(f"[OKX] Withdraw failed: {str(e)}")
-                    return False
-
-            tokens_delivered = await self._watch_for_delivery(
-                initial_client_balance=initial_client_balance,
-                withdrawal_id=withdrawal_id,
-                token=token,
-                chain=chain
+            if initial_client_balance is None:
+                raise ValueError(f"could not read {token_symbol} balance of {self.client.address}")
+
+            logger.info(f"[OKX] Trying to withdraw {amount_to_withdraw} {token_symbol} to {self.client.address}")
+
+            okx_chain_name = "CELO" if chain.chain_id == 42220 else chain.name
+
+            await rate_limiter.acquire(url=OKX_API_URL)
+            data = await self.exchange.withdraw(
+                token_symbol,
+                amount_to_withdraw,
+                self.client.address,
+                params={
+                    "toAddress": self.client.address,
+                    "chainName": f"{token_symbol}-{okx_chain_name}",
+                    "dest": 4,
+                    "fee": OKX_WITHDRAWAL_CHAIN_TO_DATA[chain.name]["fee"],
+                    "pwd": "-",
+                    "amt": amount_to_withdraw,
+                    "network": okx_chain_name,
+                },
             )
+            withdrawal_id = data["info"]["wdId"]
 
-            if tokens_delivered:
-                logger.success(f"[OKX] Successfully withdrew {amount_to_withdraw} {token_symbol}")
-                return True
-            return False
+        except Exception as e:
+            error_message = str(e)
+
+            if "Withdrawal address is not allowlisted for verification exemption" in error_message:
+                logger.error(f"[OKX] Address {self.client.address} is not allowlisted")
+                return False
+            elif "Insufficient balance" in error_message:
+                logger.error(f"[OKX] Insufficient funds for withdrawal")
+                return False
+            else:
+                logger.error(f"[OKX] Error while withdrawing {amount_to_withdraw} {token_symbol}: {error_message}")
+
+            if retry_count < OKX_ON_FAIL_RETRY_COUNT:
+                logger.info(f"[OKX] Withdrawal unsuccessful, waiting for another try")
+                await sleep_pause(delay_range=OKX_AFTER_ERROR_SLEEP_TIME, enable_message=False)
+                return await self.withdraw(
+                    retry_count=retry_count + 1,
+                    amount_to_withdraw=amount_to_withdraw,
+                    token=token,
+                    chain=chain
+                )
+            else:
+                logger.error(f"[OKX] Withdraw failed: {str(e)}")
+                return False
+
+        tokens_delivered = await self._watch_for_delivery(
+            initial_client_balance=initial_client_balance,
+            withdrawal_id=withdrawal_id,
+            token_address=token_address,
+            chain=chain
+        )
 
-    async def _wait_for_withdrawal_final_status(self, withdrawal_id: str) -> bool:
-        attempt_count = 1
-        max_wait_time = OKX_WAIT_FOR_WITHDRAWAL_FINAL_STATUS_MAX_WAIT_TIME
-        max_attempts = OKX_WAIT_FOR_WITHDRAWAL_FINAL_STATUS_ATTEMPTS
+        if tokens_delivered:
+            logger.success(f"[OKX] Successfully withdrew {amount_to_withdraw} {token_symbol}")
+            return True
+        return False
 
+    async def _wait_for_withdrawal_final_status(self, withdrawal_id: str) -> bool:
         logger.info(f"[OKX] Waiting for withdrawal final status")
-        while attempt_count <= max_attempts:
-            async with self.exchange as exchange:
-                try:
-                    status = await exchange.private_get_asset_deposit_withdraw_status(params={"wdId": withdrawal_id})
-
-                    if "Cancelation complete" in status["data"][0]["state"]:
-                        raise WithdrawalCancelledError
-                    if "Withdrawal complete" not in status["data"][0]["state"]:
-                        attempt_count += 1
-                        await sleep_pause(delay_range=max_wait_time, enable_message=False, enable_pr_bar=False)
-                    else:
-                        logger.info("[OKX] Withdrawal sent from OKX")
-                        return True
-
-                except WithdrawalCancelledError as e:
-                    logger.error(f"[OKX] {e}")
-                    return False
-                except Exception as e:
-                    logger.error(f"[OKX] Error in wait_for_withdrawal_final_status function: {e}")
-                    return False
-        logger.error("[OKX] Max attempts reached. Withdrawal status not finalized.")
-        return False
 
-    async def _watch_for_delivery(self, withdrawal_id: str, initial_client_balance: float, token, chain) -> bool:
+        try:
+            state = await self.withdrawal_tracker.wait_for_final_status(withdrawal_id=withdrawal_id)
+
+            if state in OKX_WITHDRAWAL_FAILED_STATES:
+                raise WithdrawalCancelledError
+
+            logger.info("[OKX] Withdrawal sent from OKX")
+            return True
+
+        except WithdrawalCancelledError as e:
+            logger.error(f"[OKX] {e}")
+            return False
+        except asyncio.TimeoutError:
+            logger.error("[OKX] Max wait time reached. Withdrawal status not finalized.")
+            return False
+
+    async def _watch_for_delivery(
+            self, withdrawal_id: str, initial_client_balance: int, token_address: str | None, chain: Chain
+    ) -> bool:
         withdrawal_completed_status = await self._wait_for_withdrawal_final_status(withdrawal_id)
 
         if not withdrawal_completed_status:
@@ -149,7 +250,7 @@ class OKX:
 
         withdrawal_received_status = await self._wait_for_withdrawal_received(
             initial_client_balance,
-            token=token,
+            token_address=token_address,
             chain=chain
         )
 
@@ -159,31 +260,26 @@ class OKX:
 
         return withdrawal_completed_status and withdrawal_received_status
 
-    async def _wait_for_withdrawal_received(self, initial_balance: float, token: Token | str, chain: Chain) -> bool:
-        attempt_count = 0
-        max_attempts = OKX_WAIT_FOR_WITHDRAWAL_RECEIVED_ATTEMPTS
-        max_wait_time = OKX_WAIT_FOR_WITHDRAWAL_RECIEVED_SLEEP_TIME
-
+    async def _wait_for_withdrawal_received(
+            self, initial_balance: int, token_address: str | None, chain: Chain
+    ) -> bool:
         try:
             logger.info(f"[OKX] Waiting for funds on the wallet")
-            while attempt_count < max_attempts:
-                if type(token) is str:
-                    final_balance = await self.client.get_native_balance(chain=chain) / 10 ** 18
-                else:
-                    final_balance = await self.client.get_token_balance(token=token)
-
-                if final_balance > initial_balance:
-                    return True
-
-                attempt_count += 1
-                await sleep_pause(max_wait_time, enable_message=False)
-            raise WithdrawalNotReceivedError
+            await watcher_pool.get_funds_watcher(chain=chain).wait_for_balance(
+                address=self.client.address,
+                min_balance=initial_balance,
+                token_address=token_address,
+                timeout=OKX_WITHDRAWAL_RECEIVED_TIMEOUT
+            )
+            return True
 
-        except WithdrawalNotReceivedError as e:
-            logger.error(f"[OKX] {e}")
+        except asyncio.TimeoutError:
+            logger.error(f"[OKX] {WithdrawalNotReceivedError()}")
         except Exception as e:
             logger.error(f"[OKX] {e}")
 
+        return False
+
 
 class WithdrawalCancelledError(Exception):
     def __init__(self, message: str = "Withdrawal cancelled", *args: object) -> None:
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import math
+import sys
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, Iterator
+
+from rich.live import Live
+from rich.progress_bar import ProgressBar
+from rich.table import Table
+
+from config import HEADLESS_MODE
+
+SLEEP_DISPLAY_REFRESH_INTERVAL = 1
+
+SLEEP_DISPLAY_MAX_ROWS = 20
+
+# wallet the current task works with, shown next to its delays
+wallet_label: ContextVar[str | None] = ContextVar("wallet_label", default=None)
+
+
+def set_wallet_label(address: str) -> None:
+    wallet_label.set(f"{address[:6]}...{address[-4:]}")
+
+
+@dataclass
+class Sleeper:
+    label: str
+    started_at: float
+    ends_at: float
+
+
+class SleepDisplay:
+    """
+    One live table with every pending delay, redrawn by a single task once per second
+    while anything is sleeping. Disabled with HEADLESS_MODE or when the output is not a terminal.
+    """
+
+    def __init__(self, headless: bool = HEADLESS_MODE) -> None:
+        self.headless = headless or not sys.stdout.isatty()
+        self.sleepers: Dict[int, Sleeper] = {}
+        self._ids = itertools.count()
+        self._task: asyncio.Task | None = None
+
+    @contextmanager
+    def track(self, delay: float) -> Iterator[None]:
+        if self.headless:
+            yield
+            return
+
+        sleeper_id = next(self._ids)
+        now = time.monotonic()
+        self.sleepers[sleeper_id] = Sleeper(label=wallet_label.get() or "-", started_at=now, ends_at=now + delay)
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._render())
+
+        try:
+            yield
+        finally:
+            self.sleepers.pop(sleeper_id, None)
+
+    async def _render(self) -> None:
+        with Live(self._build_table(), auto_refresh=False, transient=True) as live:
+            while self.sleepers:
+                live.update(self._build_table(), refresh=True)
+                await asyncio.sleep(SLEEP_DISPLAY_REFRESH_INTERVAL)
+
+    def _build_table(self) -> Table:
+        now = time.monotonic()
+        sleepers = sorted(self.sleepers.values(), key=lambda sleeper: sleeper.ends_at)
+
+        table = Table(title=f"Waiting: {len(sleepers)}", title_justify="left")
+        table.add_column("Wallet")
+        table.add_column("Left", justify="right")
+        table.add_column("")
+
+        for sleeper in sleepers[:SLEEP_DISPLAY_MAX_ROWS]:
+            total = sleeper.ends_at - sleeper.started_at
+            table.add_row(
+                sleeper.label,
+                f"{max(0, math.ceil(sleeper.ends_at - now))}s",
+                ProgressBar(total=total, completed=min(total, now - sleeper.started_at), width=30)
+            )
+
+        if len(sleepers) > SLEEP_DISPLAY_MAX_ROWS:
+            table.add_row(f"... and {len(sleepers) - SLEEP_DISPLAY_MAX_ROWS} more", "", "")
+
+        return table
+
+
+sleep_display = SleepDisplay()
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from asyncio import FIRST_COMPLETED
+from typing import Any, Dict, List, Tuple
+
+from aiohttp import ClientConnectorError, ClientSession, ClientTimeout, TCPConnector
+from web3 import AsyncWeb3
+from web3.middleware import async_geth_poa_middleware
+from web3.providers.async_rpc import AsyncHTTPProvider
+from web3.types import RPCEndpoint, RPCResponse
+
+from sdk.constants import (
+    RPC_CONNECTION_LIMIT,
+    RPC_CONNECTION_LIMIT_PER_HOST,
+    RPC_KEEPALIVE_TIMEOUT,
+    RPC_REQUEST_TIMEOUT,
+    RPC_WRITE_METHODS
+)
+from sdk.contracts import contract_cache
+from sdk.logger import logger
+from sdk.models.chain import Chain
+from sdk.proxy_rotation import proxy_rotator
+from sdk.rate_limiter import rate_limiter
+from sdk.rpc_health import rpc_health
+
+
+class PooledHTTPProvider(AsyncHTTPProvider):
+    """
+    AsyncHTTPProvider that sends requests through a long-lived session owned by the ProviderPool.
+    Requests go to the fastest healthy endpoint of the chain; reads are hedged to the next endpoint when slow
+    and fail over on errors.
+    """
+
+    def __init__(self, endpoint_uris: List[str], pool: ProviderPool, proxy: str | None = None) -> None:
+        request_kwargs = {"proxy": f"http://{proxy}"} if proxy else {}
+        super().__init__(endpoint_uri=endpoint_uris[0], request_kwargs=request_kwargs)
+        self.endpoint_uris = endpoint_uris
+        self.pool = pool
+        self.proxy = proxy
+
+    async def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        request_data = self.encode_rpc_request(method, params)
+
+        if method in RPC_WRITE_METHODS:
+            raw_response = await self._send(request_data=request_data)
+        else:
+            raw_response = await self._send_hedged(request_data=request_data)
+
+        return self.decode_rpc_response(raw_response)
+
+    async def make_batch_request(self, requests: List[Tuple[RPCEndpoint, Any]]) -> List[RPCResponse]:
+        """Sends several calls as one JSON-RPC batch and returns the responses in request order."""
+        request_ids = [next(self.request_counter) for _ in requests]
+        request_data = json.dumps([
+            {"jsonrpc": "2.0", "method": method, "params": params, "id": request_id}
+            for (method, params), request_id in zip(requests, request_ids)
+        ]).encode()
+
+        raw_response = await self._send_hedged(request_data=request_data)
+
+        responses = {response["id"]: response for response in json.loads(raw_response)}
+        return [responses.get(request_id, {"error": "missing response"}) for request_id in request_ids]
+
+    async def _post(self, endpoint: str, request_data: bytes) -> bytes:
+        await rate_limiter.acquire(url=endpoint, proxy=self.proxy)
+        started_at = time.monotonic()
+
+        try:
+            # the session is taken inside track, a mobile proxy closes it when changing ip
+            async with proxy_rotator.track(proxy=self.proxy):
+                session = self.pool.get_session(proxy=self.proxy)
+
+                async with session.post(endpoint, data=request_data, **self.get_request_kwargs()) as response:
+                    response.raise_for_status()
+                    raw_response = await response.read()
+        except asyncio.CancelledError:
+            # lost a hedge race, the time it has taken so far is still a lower bound of its latency
+            rpc_health.record_latency(endpoint, latency=time.monotonic() - started_at)
+            raise
+        except Exception:
+            rpc_health.record_failure(endpoint)
+            raise
+
+        rpc_health.record_success(endpoint, latency=time.monotonic() - started_at)
+        return raw_response
+
+    async def _send(self, request_data: bytes) -> bytes:
+        endpoints = rpc_health.rank(self.endpoint_uris)
+
+        for endpoint in endpoints[:-1]:
+            try:
+                return await self._post(endpoint=endpoint, request_data=request_data)
+            except ClientConnectorError as e:
+                logger.debug(f"[RPC] Couldn't connect to {endpoint}, trying the next one: {e}", send_to_tg=False)
+
+        return await self._post(endpoint=endpoints[-1], request_data=request_data)
+
+    async def _send_hedged(self, request_data: bytes) -> bytes:
+        endpoints = iter(rpc_health.rank(self.endpoint_uris))
+        pending = set()
+        last_error = None
+
+        try:
+            while True:
+                endpoint = next(endpoints, None)
+
+                if endpoint is not None:
+                    pending.add(asyncio.create_task(self._post(endpoint=endpoint, request_data=request_data)))
+                    hedge_delay = rpc_health.get_hedge_delay(endpoint)
+                elif pending:
+                    hedge_delay = None
+                else:
+                    raise last_error
+
+                done, pending = await asyncio.wait(pending, timeout=hedge_delay, return_when=FIRST_COMPLETED)
+
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    last_error = task.exception()
+
+                # nothing has succeeded yet: the hedge delay ran out or a request failed, so the next endpoint is tried
+        finally:
+            for task in pending:
+                task.cancel()
+
+
+class ProviderPool:
+    def __init__(self) -> None:
+        self._web3: Dict[Tuple[str, str | None], AsyncWeb3] = {}
+        self._sessions: Dict[str | None, ClientSession] = {}
+
+    def get_web3(self, chain: Chain, proxy: str | None = None) -> AsyncWeb3:
+        key = (chain.name, proxy)
+
+        if key not in self._web3:
+            if not chain.rpcs:
+                raise NoRPCEndpointSpecifiedError(
+                    f"No RPC endpoint specified for {chain.name}. Specify one in config.py file"
+                )
+
+            provider = PooledHTTPProvider(endpoint_uris=chain.rpcs, pool=self, proxy=proxy)
+            w3 = AsyncWeb3(provider)
+            w3.middleware_onion.inject(async_geth_poa_middleware, layer=0)
+            # the validation middleware requests eth_chainId before every call, estimate and send;
+            # chain ids are cached by the nonce manager instead
+            w3.middleware_onion.remove("validation")
+            self._web3[key] = w3
+
+        return self._web3[key]
+
+    def get_session(self, proxy: str | None = None) -> ClientSession:
+        session = self._sessions.get(proxy)
+
+        if session is None or session.closed:
+            connector = TCPConnector(
+                limit=RPC_CONNECTION_LIMIT,
+                limit_per_host=RPC_CONNECTION_LIMIT_PER_HOST,
+                keepalive_timeout=RPC_KEEPALIVE_TIMEOUT
+            )
+            session = ClientSession(connector=connector, timeout=ClientTimeout(total=RPC_REQUEST_TIMEOUT))
+            self._sessions[proxy] = session
+
+        return session
+
+    async def close_session(self, proxy: str | None) -> None:
+        """Closes the session of one proxy, the next request through it opens new connections."""
+        session = self._sessions.pop(proxy, None)
+
+        if session is not None and not session.closed:
+            await session.close()
+
+    async def close(self) -> None:
+        for session in self._sessions.values():
+            if not session.closed:
+                await session.close()
+
+        if self._sessions:
+            logger.debug(f"[ProviderPool] Closed {len(self._sessions)} HTTP sessions", send_to_tg=False)
+
+        self._sessions.clear()
+        self._web3.clear()
+        contract_cache.clear()
+
+
+class NoRPCEndpointSpecifiedError(Exception):
+    def __init__(
+            self,
+            message: str = "No RPC endpoint specified. Specify one in config.py file",
+            *args: object,
+    ) -> None:
+        self.message = message
+        super().__init__(self.message, *args)
+
+
+provider_pool = ProviderPool()
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict
+
+from config import USE_MOBILE_PROXY, PROXY_CHANGE_IP_URL
+from sdk.logger import logger
+from sdk.utils import change_ip
+
+
+@dataclass
+class MobileProxy:
+    proxy: str
+    change_ip_url: str
+    wallet: str | None = None
+    in_flight: int = 0
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    # set while requests may go through the proxy, cleared while its ip is being changed
+    ready: asyncio.Event = field(default_factory=asyncio.Event)
+    idle: asyncio.Event = field(default_factory=asyncio.Event)
+
+    def __post_init__(self) -> None:
+        self.ready.set()
+        self.idle.set()
+
+
+class ProxyRotator:
+    """
+    One wallet per ip for mobile proxies: every proxy serves one wallet at a time and changes its ip when it
+    switches to another wallet. Before the change, new requests through the proxy are held back, the ones in
+    flight are drained and its HTTP session is closed, so no connection keeps the old ip.
+    Proxies of a pool work in parallel, each with its own PROXY_CHANGE_IP_URL.
+    A proxy without a change ip url is used as a regular proxy.
+    """
+
+    def __init__(self, enabled: bool = USE_MOBILE_PROXY) -> None:
+        self.enabled = enabled
+        self.proxies: Dict[str, MobileProxy] = {}
+
+    @asynccontextmanager
+    async def use(self, proxy: str | None, wallet: str) -> AsyncIterator[None]:
+        """Holds the proxy for one wallet, changing its ip first if another wallet used it last."""
+        if not self.rotates(proxy=proxy):
+            yield
+            return
+
+        mobile_proxy = self._get_proxy(proxy=proxy)
+
+        async with mobile_proxy.lock:
+            if mobile_proxy.wallet != wallet:
+                await self._rotate(mobile_proxy=mobile_proxy)
+                mobile_proxy.wallet = wallet
+
+            yield
+
+    def rotates(self, proxy: str | None) -> bool:
+        return self.enabled and bool(proxy) and bool(self._get_proxy(proxy=proxy).change_ip_url)
+
+    @asynccontextmanager
+    async def track(self, proxy: str | None) -> AsyncIterator[None]:
+        """Wraps every request sent through a proxy, so a rotation can wait for it."""
+        if not self.enabled or not proxy:
+            yield
+            return
+
+        mobile_proxy = self._get_proxy(proxy=proxy)
+        await mobile_proxy.ready.wait()
+
+        mobile_proxy.in_flight += 1
+        mobile_proxy.idle.clear()
+
+        try:
+            yield
+        finally:
+            mobile_proxy.in_flight -= 1
+
+            if not mobile_proxy.in_flight:
+                mobile_proxy.idle.set()
+
+    async def _rotate(self, mobile_proxy: MobileProxy) -> None:
+        # providers import this module to track requests
+        from sdk.providers import provider_pool
+
+        mobile_proxy.ready.clear()
+
+        try:
+            await mobile_proxy.idle.wait()
+            await provider_pool.close_session(proxy=mobile_proxy.proxy)
+
+            if not await change_ip(url=mobile_proxy.change_ip_url):
+                logger.warning(f"[PROXY] Wallets keep using the previous ip of {mobile_proxy.proxy}")
+        finally:
+            mobile_proxy.ready.set()
+
+    def _get_proxy(self, proxy: str) -> MobileProxy:
+        if proxy not in self.proxies:
+            change_ip_url = self.get_change_ip_url(proxy=proxy)
+
+            # warned once, when the proxy is first used
+            if not change_ip_url:
+                logger.warning(
+                    f"[PROXY] No PROXY_CHANGE_IP_URL for {proxy}, its ip won't be changed between wallets",
+                    send_to_tg=False
+                )
+
+            self.proxies[proxy] = MobileProxy(proxy=proxy, change_ip_url=change_ip_url)
+
+        return self.proxies[proxy]
+
+    @staticmethod
+    def get_change_ip_url(proxy: str) -> str:
+        if isinstance(PROXY_CHANGE_IP_URL, dict):
+            return PROXY_CHANGE_IP_URL.get(proxy, "")
+
+        return PROXY_CHANGE_IP_URL
+
+
+proxy_rotator = ProxyRotator()
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Dict, Tuple
+from urllib.parse import urlparse
+
+from config import RATE_LIMITS, RATE_LIMIT_PER_PROXY
+from sdk.logger import logger
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> float:
+        """Takes one token, waiting for it if needed. Returns the time spent waiting."""
+        started_at = time.monotonic()
+
+        # waiters queue on the lock, so tokens are handed out in arrival order
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return now - started_at
+
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+@dataclass
+class RateLimitStats:
+    requests: int = 0
+    delayed_requests: int = 0
+    total_wait: float = 0
+    max_wait: float = 0
+
+
+class RateLimiter:
+    """
+    Token buckets per host (and per proxy with RATE_LIMIT_PER_PROXY), configured by RATE_LIMITS.
+    Every RPC / API request awaits acquire() before it is sent.
+    """
+
+    def __init__(self, limits: Dict[str, list] = RATE_LIMITS, per_proxy: bool = RATE_LIMIT_PER_PROXY) -> None:
+        self.limits = limits
+        self.per_proxy = per_proxy
+        self.buckets: Dict[Tuple[str, str | None], TokenBucket] = {}
+        self.stats: Dict[Tuple[str, str | None], RateLimitStats] = {}
+
+    def _get_limit_host(self, url: str) -> str:
+        """Configured host matching the url, so bsc.api.0x.org shares the api.0x.org bucket."""
+        host = urlparse(url).hostname or url
+        labels = host.split(".")
+
+        for i in range(len(labels) - 1):
+            suffix = ".".join(labels[i:])
+            if suffix in self.limits:
+                return suffix
+
+        return host
+
+    async def acquire(self, url: str, proxy: str | None = None) -> None:
+        host = self._get_limit_host(url)
+        key = (host, proxy if self.per_proxy else None)
+
+        if key not in self.buckets:
+            rate, burst = self.limits.get(host, self.limits["default"])
+            self.buckets[key] = TokenBucket(rate=rate, burst=burst)
+            self.stats[key] = RateLimitStats()
+
+        waited = await self.buckets[key].acquire()
+
+        stats = self.stats[key]
+        stats.requests += 1
+        stats.total_wait += waited
+        stats.max_wait = max(stats.max_wait, waited)
+
+        # anything under a millisecond is bookkeeping, not queueing
+        if waited > 0.001:
+            stats.delayed_requests += 1
+
+    def log_stats(self) -> None:
+        for (host, proxy), stats in self.stats.items():
+            if not stats.delayed_requests:
+                continue
+
+            logger.debug(
+                f"[RateLimiter] {host}{f' via {proxy}' if proxy else ''}: {stats.requests} requests, "
+                f"{stats.delayed_requests} delayed, total wait {stats.total_wait:.1f}s, "
+                f"max wait {stats.max_wait:.2f}s",
+                send_to_tg=False
+            )
+
+
+rate_limiter = RateLimiter()
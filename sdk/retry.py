@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import random
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from aiohttp import ClientConnectionError, ClientResponseError
+
+from sdk.constants import (
+    NONCE_ERROR_MESSAGES,
+    RETRY_BACKOFF_BASE,
+    RETRY_BACKOFF_MAX,
+    RETRY_RATE_LIMIT_BACKOFF_MULTIPLIER
+)
+from sdk.logger import logger
+
+
+class ErrorKind(Enum):
+    NONCE = "nonce"
+    UNDERPRICED = "underpriced"
+    RATE_LIMIT = "rate limit"
+    TIMEOUT = "timeout"
+    CONNECTION = "connection"
+    SERVER = "server"
+    FATAL = "fatal"
+
+
+TRANSIENT_ERRORS = (ErrorKind.RATE_LIMIT, ErrorKind.TIMEOUT, ErrorKind.CONNECTION, ErrorKind.SERVER)
+
+
+def classify_error(e: BaseException) -> ErrorKind:
+    message = str(e).lower()
+    # ccxt errors are matched by name, so ccxt doesn't have to be imported here
+    class_names = {cls.__name__ for cls in type(e).__mro__}
+
+    if "underpriced" in message:
+        return ErrorKind.UNDERPRICED
+    if any(error_message in message for error_message in NONCE_ERROR_MESSAGES):
+        return ErrorKind.NONCE
+
+    if isinstance(e, ClientResponseError):
+        if e.status == 429:
+            return ErrorKind.RATE_LIMIT
+        if e.status >= 500:
+            return ErrorKind.SERVER
+        return ErrorKind.FATAL
+
+    if class_names & {"RateLimitExceeded", "DDoSProtection"}:
+        return ErrorKind.RATE_LIMIT
+    if isinstance(e, asyncio.TimeoutError) or class_names & {"RequestTimeout", "TimeExhausted"}:
+        return ErrorKind.TIMEOUT
+    if isinstance(e, (ClientConnectionError, ConnectionError)) or "NetworkError" in class_names:
+        return ErrorKind.CONNECTION
+
+    if "429" in message or "too many requests" in message or "rate limit" in message:
+        return ErrorKind.RATE_LIMIT
+    if "timeout" in message or "timed out" in message:
+        return ErrorKind.TIMEOUT
+
+    return ErrorKind.FATAL
+
+
+def get_retry_after(e: BaseException | None) -> float | None:
+    """Seconds to wait requested by the server (Retry-After header), if any."""
+    headers = getattr(e, "headers", None) or {}
+    retry_after = headers.get("Retry-After")
+
+    if retry_after and retry_after.isdigit():
+        return int(retry_after)
+
+    return None
+
+
+@dataclass
+class RetryStats:
+    calls: int = 0
+    retries: int = 0
+    failures: int = 0
+    deadline_exceeded: int = 0
+    errors: Counter = field(default_factory=Counter)
+
+
+class RetryMetrics:
+    def __init__(self) -> None:
+        self.stats: Dict[str, RetryStats] = defaultdict(RetryStats)
+
+    def log_stats(self) -> None:
+        for name, stats in self.stats.items():
+            if not stats.retries and not stats.failures:
+                continue
+
+            errors = ", ".join(f"{kind}: {count}" for kind, count in stats.errors.items())
+            logger.debug(
+                f"[Retry] {name}: {stats.calls} calls, {stats.retries} retries, {stats.failures} failed, "
+                f"{stats.deadline_exceeded} out of time{f' ({errors})' if errors else ''}",
+                send_to_tg=False
+            )
+
+
+retry_metrics = RetryMetrics()
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    Retries a coroutine on transient errors (retry_on) and, with retry_on_falsy, on None / False results,
+    with exponential backoff and jitter, for at most `attempts` calls and `deadline` seconds.
+    Other errors are raised right away; when retries run out, the last error is raised or False is returned.
+    """
+
+    attempts: int = 1
+    backoff_base: float = RETRY_BACKOFF_BASE
+    backoff_max: float = RETRY_BACKOFF_MAX
+    deadline: float | None = None
+    retry_on: Tuple[ErrorKind, ...] = TRANSIENT_ERRORS
+    retry_on_falsy: bool = True
+
+    def __call__(self, func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            return await self.run(func, *args, **kwargs)
+
+        return wrapper
+
+    def get_delay(self, attempt: int, kind: ErrorKind | None = None, error: BaseException | None = None) -> float:
+        retry_after = get_retry_after(error)
+        if retry_after is not None:
+            return retry_after
+
+        delay = min(self.backoff_max, self.backoff_base * 2 ** attempt)
+        if kind is ErrorKind.RATE_LIMIT:
+            delay = min(self.backoff_max, delay * RETRY_RATE_LIMIT_BACKOFF_MULTIPLIER)
+
+        return random.uniform(delay / 2, delay)
+
+    async def run(self, func: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        stats = retry_metrics.stats[getattr(func, "__qualname__", repr(func))]
+        stats.calls += 1
+        started_at = time.monotonic()
+
+        for attempt in range(self.attempts):
+            try:
+                result = await func(*args, **kwargs)
+            except Exception as e:
+                kind = classify_error(e)
+                stats.errors[kind.value] += 1
+
+                if kind not in self.retry_on:
+                    stats.failures += 1
+                    raise
+
+                last_error = e
+            else:
+                if not self.retry_on_falsy or (result is not None and result is not False):
+                    return result
+
+                kind, last_error = None, None
+
+            if attempt == self.attempts - 1:
+                break
+
+            delay = self.get_delay(attempt=attempt, kind=kind, error=last_error)
+
+            if self.deadline is not None and time.monotonic() - started_at + delay > self.deadline:
+                stats.deadline_exceeded += 1
+                break
+
+            stats.retries += 1
+            await asyncio.sleep(delay)
+
+        stats.failures += 1
+
+        if last_error is not None:
+            raise last_error
+
+        return False
@@ -0,0 +1,83 @@
+import time
+from dataclasses import dataclass
+from typing import Dict, List
+
+from sdk.constants import (
+    RPC_HEALTH_EWMA_ALPHA,
+    RPC_MAX_ERROR_RATE,
+    RPC_FAILURE_COOLDOWN,
+    RPC_HEDGE_MIN_DELAY,
+    RPC_HEDGE_LATENCY_MULTIPLIER
+)
+from sdk.logger import logger
+
+
+@dataclass
+class EndpointHealth:
+    latency: float | None = None
+    error_rate: float = 0
+    unhealthy_until: float = 0
+
+    def is_healthy(self) -> bool:
+        return time.monotonic() >= self.unhealthy_until
+
+
+class RPCHealthTracker:
+    """
+    Keeps an EWMA of latency and error rate for every RPC endpoint.
+    Endpoints whose error rate goes above RPC_MAX_ERROR_RATE are put on a cooldown and only used as a last resort.
+    """
+
+    def __init__(self) -> None:
+        self.endpoints: Dict[str, EndpointHealth] = {}
+
+    def _get(self, endpoint: str) -> EndpointHealth:
+        if endpoint not in self.endpoints:
+            self.endpoints[endpoint] = EndpointHealth()
+
+        return self.endpoints[endpoint]
+
+    def record_latency(self, endpoint: str, latency: float) -> None:
+        health = self._get(endpoint)
+
+        if health.latency is None:
+            health.latency = latency
+        else:
+            health.latency += RPC_HEALTH_EWMA_ALPHA * (latency - health.latency)
+
+    def record_success(self, endpoint: str, latency: float) -> None:
+        self.record_latency(endpoint, latency=latency)
+
+        health = self._get(endpoint)
+        health.error_rate -= RPC_HEALTH_EWMA_ALPHA * health.error_rate
+
+    def record_failure(self, endpoint: str) -> None:
+        health = self._get(endpoint)
+        health.error_rate += RPC_HEALTH_EWMA_ALPHA * (1 - health.error_rate)
+
+        if health.error_rate > RPC_MAX_ERROR_RATE and health.is_healthy():
+            health.unhealthy_until = time.monotonic() + RPC_FAILURE_COOLDOWN
+            logger.warning(
+                f"[RPC] {endpoint} is failing ({health.error_rate:.0%} errors), "
+                f"skipping it for {RPC_FAILURE_COOLDOWN}s",
+                send_to_tg=False
+            )
+
+    def rank(self, endpoints: List[str]) -> List[str]:
+        """
+        Healthy endpoints from the fastest, then the ones on a cooldown. Unmeasured endpoints go first,
+        and every failed request costs an endpoint about RPC_HEDGE_MIN_DELAY seconds.
+        """
+        def sort_key(endpoint: str) -> tuple:
+            health = self._get(endpoint)
+            return not health.is_healthy(), (health.latency or 0) + health.error_rate * RPC_HEDGE_MIN_DELAY
+
+        return sorted(endpoints, key=sort_key)
+
+    def get_hedge_delay(self, endpoint: str) -> float:
+        """Time to wait for a read before the same request is also sent to the next endpoint."""
+        latency = self._get(endpoint).latency or 0
+        return max(RPC_HEDGE_MIN_DELAY, RPC_HEDGE_LATENCY_MULTIPLIER * latency)
+
+
+rpc_health = RPCHealthTracker()
@@ -1,19 +1,24 @@
 import asyncio
-import functools
 import json
 import random
-from typing import List
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
 
 import aiohttp
-from tqdm import tqdm
 
-from config import PROXY_CHANGE_IP_URL
 from sdk.logger import logger
+from sdk.progress import sleep_display
+from sdk.rate_limiter import rate_limiter
 
+# key files with at least this many keys are derived in a process pool
+ADDRESS_DERIVATION_POOL_THRESHOLD = 1000
+
+
+async def change_ip(url: str) -> bool:
+    await rate_limiter.acquire(url=url)
 
-async def change_ip() -> None:
     async with aiohttp.ClientSession() as session:
-        async with session.get(url=PROXY_CHANGE_IP_URL) as response:
+        async with session.get(url=url) as response:
             if response.status == 200:
                 logger.debug(f"[PROXY] Successfully changed ip address")
                 return True
@@ -32,6 +37,24 @@ def read_from_txt(file_path):
         logger.error(f"Encountered an error while reading a .txt file '{file_path}': {str(e)}.")
 
 
+def derive_address(private_key: str) -> Optional[str]:
+    # eth_account is one of the slowest imports, only modes that derive addresses should pay for it
+    from eth_account import Account
+
+    try:
+        return Account.from_key(private_key).address
+    except Exception:
+        return None
+
+
+def derive_addresses(private_keys: List[str]) -> List[Optional[str]]:
+    if len(private_keys) < ADDRESS_DERIVATION_POOL_THRESHOLD:
+        return [derive_address(private_key) for private_key in private_keys]
+
+    with ProcessPoolExecutor() as executor:
+        return list(executor.map(derive_address, private_keys, chunksize=256))
+
+
 def read_from_json(file_path):
     try:
         with open(file_path) as json_file:
@@ -51,29 +74,7 @@ async def sleep_pause(delay_range: List[int], enable_message: bool = True, enabl
         logger.info(f"Sleeping for {delay} seconds...")
 
     if enable_pr_bar:
-        with tqdm(total=delay, desc="Waiting", unit="s", dynamic_ncols=True, colour="blue") as pbar:
-            for _ in range(delay):
-                await asyncio.sleep(delay=1)
-                pbar.update(1)
+        with sleep_display.track(delay=delay):
+            await asyncio.sleep(delay=delay)
     else:
         await asyncio.sleep(delay=delay)
-
-
-def retry_on_fail(tries: int, retry_delay=None):
-    if retry_delay is None:
-        retry_delay = [5, 10]
-
-    def decorator(func):
-        @functools.wraps(func)
-        async def wrapper(*args, **kwargs):
-            for _ in range(tries):
-                result = await func(*args, **kwargs)
-                if result is None or result is False:
-                    await sleep_pause(delay_range=retry_delay, enable_message=False)
-                else:
-                    return result
-            return False
-
-        return wrapper
-
-    return decorator
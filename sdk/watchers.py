@@ -0,0 +1,342 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Set
+
+from aiohttp import ClientSession, WSMsgType
+from web3 import AsyncWeb3
+
+from sdk.constants import (
+    BLOCK_POLL_MIN_INTERVAL,
+    BLOCK_POLL_MAX_INTERVAL,
+    BLOCK_WATCHER_MAX_CATCHUP,
+    BLOCK_WATCHER_ERROR_DELAY,
+    RECEIPT_RECHECK_BLOCKS,
+    TX_RECEIPT_TIMEOUT
+)
+from sdk.logger import logger
+from sdk.models.chain import Chain
+from sdk.multicall import Multicall
+from sdk.providers import provider_pool
+
+BlockListener = Callable[[List[dict]], Awaitable[None]]
+
+
+async def _rpc_request(w3: AsyncWeb3, method: str, params: list) -> Any:
+    response = await w3.provider.make_request(method, params)
+
+    if "error" in response:
+        raise ValueError(response["error"])
+
+    return response["result"]
+
+
+class BlockWatcher:
+    """
+    Follows new blocks of one chain (eth_subscribe over WebSocket when chain.ws_rpc is set,
+    otherwise one eth_getBlockByNumber poll per block) and passes them to every listener.
+    Only runs while someone is subscribed.
+    """
+
+    def __init__(self, chain: Chain) -> None:
+        self.chain = chain
+        self.listeners: List[BlockListener] = []
+        self.last_block_number: int | None = None
+        self.block_time: float = BLOCK_POLL_MIN_INTERVAL
+        self._last_block_timestamp: int | None = None
+        self._task: asyncio.Task | None = None
+
+    def subscribe(self, listener: BlockListener) -> None:
+        self.listeners.append(listener)
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def unsubscribe(self, listener: BlockListener) -> None:
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+        if not self.listeners:
+            self.stop()
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+        self.last_block_number = None
+        self._last_block_timestamp = None
+
+    async def _run(self) -> None:
+        w3 = provider_pool.get_web3(chain=self.chain)
+
+        while True:
+            try:
+                if self.chain.ws_rpc:
+                    await self._follow_ws(w3=w3)
+                else:
+                    await self._follow_polling(w3=w3)
+            except Exception as e:
+                logger.warning(
+                    f"[BlockWatcher] {self.chain.name}: {e}, restarting in {BLOCK_WATCHER_ERROR_DELAY}s",
+                    send_to_tg=False
+                )
+                await asyncio.sleep(BLOCK_WATCHER_ERROR_DELAY)
+
+    async def _follow_polling(self, w3: AsyncWeb3) -> None:
+        while True:
+            head = await _rpc_request(w3, "eth_getBlockByNumber", ["latest", False])
+            block_number = int(head["number"], 16)
+
+            if self.last_block_number is None or block_number > self.last_block_number:
+                await self._on_head(w3=w3, block_number=block_number, head=head)
+
+            await asyncio.sleep(min(BLOCK_POLL_MAX_INTERVAL, max(BLOCK_POLL_MIN_INTERVAL, self.block_time)))
+
+    async def _follow_ws(self, w3: AsyncWeb3) -> None:
+        # a separate session: the pooled one has a total timeout that would cut the subscription
+        async with ClientSession() as session, session.ws_connect(self.chain.ws_rpc, heartbeat=30) as ws:
+            await ws.send_json({"jsonrpc": "2.0", "id": 1, "method": "eth_subscribe", "params": ["newHeads"]})
+
+            async for message in ws:
+                if message.type != WSMsgType.TEXT:
+                    break
+
+                data = json.loads(message.data)
+
+                if "error" in data:
+                    raise ValueError(data["error"])
+
+                if data.get("method") != "eth_subscription":
+                    continue
+
+                block_number = int(data["params"]["result"]["number"], 16)
+
+                if self.last_block_number is None or block_number > self.last_block_number:
+                    await self._on_head(w3=w3, block_number=block_number)
+
+        raise ConnectionError("WebSocket connection closed")
+
+    async def _on_head(self, w3: AsyncWeb3, block_number: int, head: dict | None = None) -> None:
+        if self.last_block_number is None:
+            self.last_block_number = block_number - 1
+
+        first_block_number = max(self.last_block_number + 1, block_number - BLOCK_WATCHER_MAX_CATCHUP + 1)
+        missing_numbers = range(first_block_number, block_number if head else block_number + 1)
+        blocks = []
+
+        # blocks missed between two heads are fetched in one batch
+        if missing_numbers:
+            responses = await w3.provider.make_batch_request([
+                ("eth_getBlockByNumber", [hex(number), False]) for number in missing_numbers
+            ])
+            blocks = [response["result"] for response in responses if response.get("result")]
+
+        if head:
+            blocks.append(head)
+
+        if blocks:
+            self._update_block_time(block=blocks[-1])
+
+        self.last_block_number = block_number
+
+        for listener in list(self.listeners):
+            try:
+                await listener(blocks)
+            except Exception as e:
+                logger.exception(f"[BlockWatcher] {self.chain.name} listener failed: {e}")
+
+    def _update_block_time(self, block: dict) -> None:
+        """EWMA of the time between blocks, used as the polling interval."""
+        block_number, timestamp = int(block["number"], 16), int(block["timestamp"], 16)
+
+        if self._last_block_timestamp is not None and block_number > self.last_block_number:
+            block_time = (timestamp - self._last_block_timestamp) / (block_number - self.last_block_number)
+            self.block_time += 0.5 * (block_time - self.block_time)
+
+        self._last_block_timestamp = timestamp
+
+
+class ReceiptWatcher:
+    """
+    Waits for receipts of all pending transactions of one chain at once: on every new block, receipts of
+    transactions included in it (and of the ones added since the previous block) are requested in one batch.
+    """
+
+    def __init__(self, chain: Chain, block_watcher: BlockWatcher) -> None:
+        self.chain = chain
+        self.block_watcher = block_watcher
+        self.pending: Dict[str, asyncio.Future] = {}
+        self.unchecked: Set[str] = set()
+        self.blocks_since_recheck = 0
+
+    async def wait_for_receipt(self, tx_hash: str, timeout: float = TX_RECEIPT_TIMEOUT) -> dict:
+        """Returns the raw JSON-RPC receipt, raises asyncio.TimeoutError if it isn't mined in time."""
+        tx_hash = tx_hash.lower()
+        future = asyncio.get_running_loop().create_future()
+
+        self.pending[tx_hash] = future
+        self.unchecked.add(tx_hash)
+
+        if len(self.pending) == 1:
+            self.block_watcher.subscribe(self._on_blocks)
+
+        try:
+            return await asyncio.wait_for(future, timeout=timeout)
+        finally:
+            self.pending.pop(tx_hash, None)
+
+            if not self.pending:
+                self.block_watcher.unsubscribe(self._on_blocks)
+
+    async def _on_blocks(self, blocks: List[dict]) -> None:
+        self.blocks_since_recheck += len(blocks)
+
+        # a transaction is looked up once when added and then only when a block includes it,
+        # with a periodic recheck of everything in case a block was skipped
+        if self.blocks_since_recheck >= RECEIPT_RECHECK_BLOCKS:
+            self.blocks_since_recheck = 0
+            tx_hashes = set(self.pending)
+        else:
+            tx_hashes = {
+                tx_hash.lower() for block in blocks for tx_hash in block["transactions"]
+                if tx_hash.lower() in self.pending
+            }
+            tx_hashes |= self.unchecked & self.pending.keys()
+
+        self.unchecked.clear()
+
+        if not tx_hashes:
+            return
+
+        tx_hashes = list(tx_hashes)
+        w3 = provider_pool.get_web3(chain=self.chain)
+        responses = await w3.provider.make_batch_request([
+            ("eth_getTransactionReceipt", [tx_hash]) for tx_hash in tx_hashes
+        ])
+
+        for tx_hash, response in zip(tx_hashes, responses):
+            receipt = response.get("result")
+            future = self.pending.get(tx_hash)
+
+            if receipt and future and not future.done():
+                future.set_result(receipt)
+
+
+@dataclass
+class FundsWaiter:
+    address: str
+    token_address: str | None
+    min_balance: int
+    future: asyncio.Future
+
+
+class FundsWatcher:
+    """
+    Waits for incoming funds of all waiting addresses of one chain at once: on every new block, balances of
+    every address waiting for the same token are read with one Multicall and waiters whose balance rose are woken.
+    """
+
+    def __init__(self, chain: Chain, block_watcher: BlockWatcher) -> None:
+        self.chain = chain
+        self.block_watcher = block_watcher
+        self.pending: Dict[int, FundsWaiter] = {}
+        self._ids = itertools.count()
+
+    async def get_balance(self, address: str, token_address: str | None = None) -> int | None:
+        """Current balance in wei (native coin when token_address is None), None if it could not be read."""
+        balances = await self._get_balances(token_address=token_address, addresses=[address])
+        return balances.get(address)
+
+    async def wait_for_balance(
+            self, address: str, min_balance: int, token_address: str | None = None, timeout: float = None
+    ) -> int:
+        """Waits until the balance gets above min_balance and returns it, raises asyncio.TimeoutError on timeout."""
+        waiter_id = next(self._ids)
+        self.pending[waiter_id] = FundsWaiter(
+            address=address,
+            token_address=token_address,
+            min_balance=min_balance,
+            future=asyncio.get_running_loop().create_future()
+        )
+
+        if len(self.pending) == 1:
+            self.block_watcher.subscribe(self._on_blocks)
+
+        try:
+            return await asyncio.wait_for(self.pending[waiter_id].future, timeout=timeout)
+        finally:
+            self.pending.pop(waiter_id, None)
+
+            if not self.pending:
+                self.block_watcher.unsubscribe(self._on_blocks)
+
+    async def _on_blocks(self, blocks: List[dict]) -> None:
+        waiters_by_token: Dict[str | None, List[FundsWaiter]] = defaultdict(list)
+
+        for waiter in self.pending.values():
+            if not waiter.future.done():
+                waiters_by_token[waiter.token_address].append(waiter)
+
+        await asyncio.gather(*[
+            self._check_balances(token_address=token_address, waiters=waiters)
+            for token_address, waiters in waiters_by_token.items()
+        ])
+
+    async def _check_balances(self, token_address: str | None, waiters: List[FundsWaiter]) -> None:
+        addresses = list({waiter.address for waiter in waiters})
+        balances = await self._get_balances(token_address=token_address, addresses=addresses)
+
+        for waiter in waiters:
+            balance = balances.get(waiter.address)
+
+            if balance is not None and balance > waiter.min_balance and not waiter.future.done():
+                waiter.future.set_result(balance)
+
+    async def _get_balances(self, token_address: str | None, addresses: List[str]) -> Dict[str, int | None]:
+        if token_address is None:
+            return await Multicall.get_native_balances(chain=self.chain, addresses=addresses)
+
+        return await Multicall.get_token_balances(chain=self.chain, token_address=token_address, addresses=addresses)
+
+
+class WatcherPool:
+    def __init__(self) -> None:
+        self._block_watchers: Dict[str, BlockWatcher] = {}
+        self._receipt_watchers: Dict[str, ReceiptWatcher] = {}
+        self._funds_watchers: Dict[str, FundsWatcher] = {}
+
+    def get_block_watcher(self, chain: Chain) -> BlockWatcher:
+        if chain.name not in self._block_watchers:
+            self._block_watchers[chain.name] = BlockWatcher(chain=chain)
+
+        return self._block_watchers[chain.name]
+
+    def get_receipt_watcher(self, chain: Chain) -> ReceiptWatcher:
+        if chain.name not in self._receipt_watchers:
+            self._receipt_watchers[chain.name] = ReceiptWatcher(
+                chain=chain,
+                block_watcher=self.get_block_watcher(chain=chain)
+            )
+
+        return self._receipt_watchers[chain.name]
+
+    def get_funds_watcher(self, chain: Chain) -> FundsWatcher:
+        if chain.name not in self._funds_watchers:
+            self._funds_watchers[chain.name] = FundsWatcher(
+                chain=chain,
+                block_watcher=self.get_block_watcher(chain=chain)
+            )
+
+        return self._funds_watchers[chain.name]
+
+    def close(self) -> None:
+        for block_watcher in self._block_watchers.values():
+            block_watcher.stop()
+
+
+watcher_pool = WatcherPool()